@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Offline stand-in for api.openweathermap.org, newsapi.org and ipinfo.io.
+# Replays the JSON fixtures in benchmarks/fixtures after a configurable
+# latency, fails a configurable share of calls with 503, and counts calls
+# per endpoint. Point the app at it with UPSTREAM_OWM_URL, UPSTREAM_NEWS_URL
+# and UPSTREAM_IPINFO_URL (benchmarks/run.py does this itself).
+#
+#   python -m benchmarks.mock_upstream --port 8599 --latency-ms 120 --error-rate 0.05
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+ROUTES = [
+    (re.compile(r"^/geo/1\.0/direct$"), "geocode"),
+    (re.compile(r"^/data/3\.0/onecall$"), "onecall"),
+    (re.compile(r"^/data/2\.5/weather$"), "weather"),
+    (re.compile(r"^/data/2\.5/forecast$"), "forecast"),
+    (re.compile(r"^/v2/top-headlines$"), "news"),
+    (re.compile(r"^(/[^/]+)?/json$"), "ipinfo"),
+]
+
+
+def load_fixtures(path=FIXTURES_DIR):
+    fixtures = {}
+    for _, name in ROUTES:
+        with open(os.path.join(path, f"{name}.json"), "rb") as f:
+            fixtures[name] = f.read()
+    return fixtures
+
+
+class MockUpstream:
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None, fixtures=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.fixtures = fixtures or load_fixtures()
+        self._random = random.Random(seed)
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def handle(self, path):
+        # Returns (status, body) for a request path without the query string.
+        name = next((name for pattern, name in ROUTES if pattern.match(path)), None)
+        with self._lock:
+            self._calls[name or "unknown"] = self._calls.get(name or "unknown", 0) + 1
+            delay = max(self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms), 0) / 1000
+            failed = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if name is None:
+            return 404, b'{"message": "not found"}'
+        if failed:
+            return 503, b'{"message": "service unavailable"}'
+        return 200, self.fixtures[name]
+
+    def calls(self):
+        with self._lock:
+            return dict(self._calls)
+
+    def total_calls(self):
+        with self._lock:
+            return sum(self._calls.values())
+
+
+def make_server(upstream, host="127.0.0.1", port=0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            status, body = upstream.handle(self.path.split("?", 1)[0])
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def start(upstream, host="127.0.0.1", port=0):
+    # Serves in a daemon thread; returns (server, base URL).
+    server = make_server(upstream, host, port)
+    threading.Thread(target=server.serve_forever, name="mock-upstream", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.mock_upstream",
+                                     description="Serve recorded upstream fixtures with latency and errors.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    upstream = MockUpstream(args.latency_ms, args.jitter_ms, args.error_rate)
+    server = make_server(upstream, args.host, args.port)
+    print(f"Mock upstream on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(upstream.calls()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
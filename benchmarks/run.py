@@ -0,0 +1,269 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks import mock_upstream
+
+# Headless page benchmarks against the offline upstream stand-in.
+#
+#   python -m benchmarks.run --renders 20 --latency-ms 120 --error-rate 0.05 [--cold]
+#
+# Each sample drives one page in a fresh AppTest session (a new visitor):
+# the home page as loaded, the Weather page after entering a city, and the
+# Cloudburst page after pressing Predict. Reported per page: p50/p95/mean
+# wall time of the sample and upstream calls per sample (retries included).
+# By default the process-wide caches stay warm between samples, as on a
+# running server; --cold clears them (memory and the on-disk geocode store)
+# before every sample. Model throughput is measured separately.
+#
+# Every run is appended to benchmarks/results/history.jsonl (commit, config,
+# numbers) and compared with the latest earlier run using the same config.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+HISTORY_PATH = os.path.join(RESULTS_DIR, "history.jsonl")
+API_KEY = "bench"
+CITY = "Shimla"
+TIMEOUT = 60
+
+PAGES = {
+    "home": "streamlit_app.py",
+    "weather": os.path.join("pages", "1_🌦️ Weather.py"),
+    "cloudburst": os.path.join("pages", "0_🌩️ Cloudburst Prediction.py"),
+}
+
+
+def _configure(base_url, cache_dir):
+    # Must run before any cloudburst module is imported: upstream URLs,
+    # secrets, cache location and quotas are read at import time.
+    os.environ.update({
+        "UPSTREAM_OWM_URL": base_url,
+        "UPSTREAM_NEWS_URL": base_url,
+        "UPSTREAM_IPINFO_URL": base_url,
+        "WEATHER_API_KEY": API_KEY,
+        "NEWS_API_KEY": API_KEY,
+        "CLOUDBURST_CACHE_DIR": cache_dir,
+        "QUOTA_WEATHER_PER_MINUTE": "1000000",
+        "QUOTA_WEATHER_PER_DAY": "1000000",
+        "QUOTA_NEWS_PER_MINUTE": "1000000",
+        "QUOTA_NEWS_PER_DAY": "1000000",
+    })
+
+
+def _clear_caches():
+    from cloudburst import charts, geo_store, owm, predict
+
+    owm.cache.clear()
+    charts.cache.clear()
+    predict.cache.clear()
+    geo_store.store.clear()
+
+
+# --- Page drivers ---
+def _app(page):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, PAGES[page]), default_timeout=TIMEOUT)
+    at.secrets["weather"] = {"api_key": API_KEY}
+    at.secrets["news"] = {"api_key": API_KEY}
+    return at
+
+
+def _drive(page, at, sample):
+    at.run()
+    if page == "weather":
+        at.text_input[0].input(CITY).run()
+    elif page == "cloudburst":
+        # A different input each sample, so the prediction cache is not hit
+        at.number_input[0].set_value(10.0 + sample / 100)
+        at.number_input[2].set_value(0.85)
+        next(b for b in at.button if b.label == "Predict").click().run()
+    return [str(e.value) for e in at.exception]
+
+
+def bench_page(page, upstream, renders, warmup, cold):
+    times, calls, errors = [], [], []
+    for sample in range(-warmup, renders):
+        if cold:
+            _clear_caches()
+        at = _app(page)
+        before = upstream.total_calls()
+        start = time.perf_counter()
+        exceptions = _drive(page, at, sample)
+        elapsed = time.perf_counter() - start
+        if sample < 0:
+            continue
+        times.append(elapsed * 1000)
+        calls.append(upstream.total_calls() - before)
+        errors.extend(exceptions)
+    return {
+        "renders": renders,
+        "p50_ms": round(_percentile(times, 50), 1),
+        "p95_ms": round(_percentile(times, 95), 1),
+        "mean_ms": round(statistics.fmean(times), 1),
+        "upstream_calls_per_render": round(statistics.fmean(calls), 2),
+        "exceptions": errors[:5],
+    }
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def bench_predictions(rows=100_000, singles=20_000, seed=42):
+    import numpy as np
+
+    from cloudburst import predict
+    from cloudburst.model_registry import get_model
+
+    model = get_model()
+    rng = np.random.default_rng(seed)
+    X = rng.normal(0, 50, size=(rows, len(predict.FEATURES)))
+
+    start = time.perf_counter()
+    model.predict(X)
+    batch = time.perf_counter() - start
+
+    # Every call a miss: the cache is emptied before each one
+    before = predict.cache_stats()
+    start = time.perf_counter()
+    for row in X[:singles].tolist():
+        predict.cache.clear()
+        predict.predict_one(row)
+    uncached = time.perf_counter() - start
+    _check_hits(before, predict.cache_stats(), 0.0, "uncached")
+
+    # A working set that fits the LRU, primed once, then every call a hit
+    working_set = X[:min(singles, predict.cache.maxsize)].tolist()
+    for row in working_set:
+        predict.predict_one(row)
+    before = predict.cache_stats()
+    start = time.perf_counter()
+    for i in range(singles):
+        predict.predict_one(working_set[i % len(working_set)])
+    cached = time.perf_counter() - start
+    _check_hits(before, predict.cache_stats(), 1.0, "cached")
+
+    return {
+        "batch_rows_per_sec": round(rows / batch),
+        "predict_one_per_sec": round(singles / uncached),
+        "predict_one_cached_per_sec": round(singles / cached),
+    }
+
+
+def _check_hits(before, after, expected, name):
+    # The pass must measure what its name says, or its number is meaningless
+    hits = after["hits"] - before["hits"]
+    lookups = hits + after["misses"] - before["misses"]
+    if hits / lookups != expected:
+        raise RuntimeError(f"{name} predict_one pass had a hit rate of {hits / lookups:.2%}, expected {expected:.0%}")
+
+
+# --- Results ---
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _previous(config):
+    try:
+        with open(HISTORY_PATH) as f:
+            runs = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return None
+    return next((run for run in reversed(runs) if run["config"] == config), None)
+
+
+def save(result):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(HISTORY_PATH, "a") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def _delta(now, before):
+    return f"{(now - before) / before * 100:+.0f}%" if before else "n/a"
+
+
+def report(result, previous):
+    print(f"Commit {result['commit'][:12] or 'unknown'}{' (dirty)' if result['dirty'] else ''}")
+    for page, stats in result["pages"].items():
+        line = (f"  {page:<11} p50 {stats['p50_ms']:8.1f} ms  p95 {stats['p95_ms']:8.1f} ms  "
+                f"upstream calls/render {stats['upstream_calls_per_render']:.2f}")
+        old = (previous or {}).get("pages", {}).get(page)
+        if old:
+            line += f"  (p50 {_delta(stats['p50_ms'], old['p50_ms'])}, p95 {_delta(stats['p95_ms'], old['p95_ms'])}"
+            line += f" vs {previous['commit'][:12]})"
+        print(line)
+        for message in stats["exceptions"]:
+            print(f"    exception: {message}")
+    for name, value in result["predictions"].items():
+        line = f"  {name:<27} {value:>12,}/s"
+        old = (previous or {}).get("predictions", {}).get(name)
+        if old:
+            line += f"  ({_delta(value, old)})"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run",
+                                     description="Benchmark the Streamlit pages against a mock upstream.")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--renders", type=int, default=20, help="timed samples per page")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed samples per page first")
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cold", action="store_true", help="clear process caches before every sample")
+    parser.add_argument("--no-save", action="store_true", help="don't append to the results history")
+    args = parser.parse_args(argv)
+
+    upstream = mock_upstream.MockUpstream(args.latency_ms, args.jitter_ms, args.error_rate, seed=0)
+    server, base_url = mock_upstream.start(upstream)
+    _configure(base_url, tempfile.mkdtemp(prefix="cloudburst-bench-"))
+
+    # AppTest inspects elements outside a script run; the warnings are noise here
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+        lambda record: "ScriptRunContext" not in record.getMessage())
+
+    from cloudburst import warmup
+
+    # Load the model and imports up front so the first sample isn't an outlier
+    warmup.run()
+    warmup.start()
+
+    config = {"renders": args.renders, "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms,
+              "error_rate": args.error_rate, "cold": args.cold}
+    result = {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": config,
+        "pages": {page: bench_page(page, upstream, args.renders, args.warmup, args.cold) for page in args.pages},
+        "predictions": bench_predictions(),
+        "upstream_calls": upstream.calls(),
+    }
+    server.shutdown()
+
+    report(result, _previous(config))
+    if not args.no_save:
+        save(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
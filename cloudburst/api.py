@@ -0,0 +1,166 @@
+import argparse
+import sys
+import time
+from dataclasses import asdict
+from typing import Annotated, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from cloudburst import metrics, observations, owm, quota
+from cloudburst.config import secret
+from cloudburst.model_registry import get_model_with_info
+from cloudburst.predict import FEATURES
+
+# Headless JSON API next to the Streamlit UI, for systems that need
+# predictions or weather without scraping the pages. It reuses the same
+# model registry (NumPy scorer, hot reload) and the same cached weather
+# access as the pages.
+#
+#   python -m cloudburst.api --port 8000 --workers 4
+#   (or: uvicorn cloudburst.api:app --workers 4)
+#
+# /predict is async and does no I/O, so it never waits on the thread pool;
+# the weather endpoints block on upstream calls and run in the pool.
+
+MAX_ROWS = 100_000
+
+app = FastAPI(title="Cloudburst API")
+
+
+# One value per model feature, in FEATURES order; anything else is a 422
+Row = Annotated[List[float], Field(min_length=len(FEATURES), max_length=len(FEATURES),
+                                   description=f"{len(FEATURES)} values: {', '.join(FEATURES)}")]
+
+
+class PredictRequest(BaseModel):
+    features: Optional[Row] = None
+    rows: Optional[List[Row]] = None
+
+
+def _positive_column(model):
+    return int(np.flatnonzero(np.asarray(model.classes_) == 1)[0])
+
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus():
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/quota")
+async def quota_stats():
+    # Remaining upstream budget and throttled calls, plus stale cache serves
+    return {"quota": quota.stats(), "weather_cache": owm.cache_stats()}
+
+
+@app.get("/model")
+async def model():
+    _, info = get_model_with_info()
+    info = dict(info)
+    info.pop("path", None)
+    return dict(info, features=FEATURES)
+
+
+@app.post("/predict")
+async def predict(req: PredictRequest):
+    if (req.features is None) == (req.rows is None):
+        raise HTTPException(422, "Send either 'features' (one row) or 'rows' (a batch).")
+    rows = [req.features] if req.features is not None else req.rows
+    if len(rows) > MAX_ROWS:
+        raise HTTPException(413, f"At most {MAX_ROWS} rows per request.")
+    if not rows:
+        raise HTTPException(422, "'rows' is empty.")
+    X = np.asarray(rows, dtype=np.float64)
+
+    # Read as a pair, so a hot swap can't label one model's output with another's version
+    model, info = get_model_with_info()
+    with metrics.timed("api.predict"):
+        predictions = model.predict(X)
+        probability = model.predict_proba(X)[:, _positive_column(model)]
+    version = info["version"]
+    if req.features is not None:
+        return {"prediction": int(predictions[0]), "cloudburst": bool(predictions[0] == 1),
+                "probability": float(probability[0]), "model_version": version}
+    return {"predictions": predictions.tolist(), "probabilities": probability.tolist(), "model_version": version}
+
+
+def _throttled(e):
+    return HTTPException(429, f"Rate limited ({e}); try again later.", headers={"Retry-After": "60"})
+
+
+def _report(city, units):
+    try:
+        report = owm.weather_report(city, secret("weather", "api_key"), units)
+    except quota.QuotaExceeded as e:
+        raise _throttled(e)
+    if report is None:
+        raise HTTPException(404, "City not found.")
+    return report
+
+
+@app.get("/weather/{city}")
+def weather(city: str, units: str = Query("metric", pattern="^(metric|imperial)$")):
+    report = _report(city, units)
+    return {"place": asdict(report.place), "units": units, "tz_offset": report.tz_offset,
+            "current": asdict(report.current), "stale": report.stale}
+
+
+@app.get("/history/{city}")
+def history(city: str, days: float = Query(observations.HISTORY_DAYS, gt=0, le=366)):
+    # Stored observations with retrospective predictions; never calls upstream
+    # beyond geocoding an unknown city.
+    try:
+        place = owm.geocode(city, secret("weather", "api_key"))
+    except quota.QuotaExceeded as e:
+        raise _throttled(e)
+    if place is None:
+        raise HTTPException(404, "City not found.")
+    scored = observations.store.score(place.lat, place.lon, time.time() - days * 86400)
+    return {
+        "place": asdict(place),
+        "features": FEATURES,
+        "observations": [
+            {"dt": int(row.dt), "features": [float(getattr(row, c)) for c in observations.COLUMNS],
+             "condition": row.main, "cloudburst": bool(row.Cloudburst)}
+            for row in scored.itertuples(index=False)
+        ],
+    }
+
+
+@app.get("/forecast/{city}")
+def forecast(city: str, units: str = Query("metric", pattern="^(metric|imperial)$"),
+             hours: int = Query(24, ge=1, le=owm.HOURS)):
+    report = _report(city, units)
+    hourly = report.hourly
+    hourly = hourly[hourly["time"] < hourly["time"].iloc[0] + np.timedelta64(hours, "h")] if len(hourly) else hourly
+    return {
+        "place": asdict(report.place),
+        "units": units,
+        "hourly": [
+            {"time": t.isoformat(), "temp": temp, "humidity": hum, "pop": pop}
+            for t, temp, hum, pop in zip(hourly["time"], hourly["temp"], hourly["humidity"], hourly["pop"])
+        ],
+    }
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(prog="python -m cloudburst.api", description="Run the Cloudburst JSON API.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+    uvicorn.run("cloudburst.api:app", host=args.host, port=args.port, workers=args.workers)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import weakref
+
+import pandas as pd
+
+from cloudburst import metrics
+from cloudburst.model_registry import get_model
+from cloudburst.predict import FEATURES
+
+# Scores station logs in the weatherHistory.csv layout one chunk at a time:
+# each chunk is a single vectorized predict call and is appended to the
+# output straight away, so memory stays flat whatever the file size.
+
+CHUNKSIZE = 50_000
+PASSTHROUGH = ["Formatted Date"]
+DTYPES = {name: "float64" for name in FEATURES}
+
+
+def _writer(dst, fmt):
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)")
+
+        state = {}
+
+        def write(df):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if "writer" not in state:
+                state["writer"] = pq.ParquetWriter(dst, table.schema)
+            state["writer"].write_table(table)
+
+        def close():
+            if "writer" in state:
+                state["writer"].close()
+
+        return write, close
+
+    first = [True]
+
+    def write(df):
+        df.to_csv(dst, mode="w" if first[0] else "a", header=first[0], index=False)
+        first[0] = False
+
+    return write, lambda: None
+
+
+def score_file(src, dst, fmt="csv", chunksize=CHUNKSIZE, progress=None):
+    model = get_model()
+    write, close = _writer(dst, fmt)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        reader = pd.read_csv(
+            src,
+            usecols=lambda c: c in DTYPES or c in PASSTHROUGH,
+            dtype=DTYPES,
+            chunksize=chunksize,
+        )
+        for chunk in reader:
+            missing = [c for c in FEATURES if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"Missing columns: {', '.join(missing)}")
+            chunk = chunk[[c for c in PASSTHROUGH if c in chunk.columns] + FEATURES]
+            with metrics.timed("model.predict_batch"):
+                prediction = model.predict(chunk[FEATURES].to_numpy())
+            chunk = chunk.assign(Prediction=prediction, Cloudburst=prediction == 1)
+            write(chunk)
+            rows += len(chunk)
+            if progress:
+                progress(rows, time.perf_counter() - start)
+    finally:
+        close()
+
+    seconds = time.perf_counter() - start
+    return {"rows": rows, "seconds": seconds, "rows_per_sec": rows / seconds if seconds else 0.0}
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ScoredFile:
+    # Temp output for the page. The file is deleted by discard(), when the
+    # object is garbage collected (its Streamlit session ended) or at exit.
+    def __init__(self, fmt, file_name):
+        fd, self.path = tempfile.mkstemp(prefix="cloudburst-", suffix=f".{fmt}")
+        os.close(fd)
+        self.file_name = file_name
+        self.stats = None
+        self._finalizer = weakref.finalize(self, _remove, self.path)
+
+    def discard(self):
+        self._finalizer()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cloudburst.batch",
+                                     description="Score a weatherHistory.csv-style file for cloudburst risk.")
+    parser.add_argument("input", help="CSV with the notebook's feature columns")
+    parser.add_argument("-o", "--output", help="output file (default: <input>_scored.<format>)")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None)
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if (args.output or "").endswith(".parquet") else "csv")
+    output = args.output or f"{os.path.splitext(args.input)[0]}_scored.{fmt}"
+
+    def progress(rows, seconds):
+        print(f"\r{rows:,} rows  {rows / seconds if seconds else 0:,.0f} rows/s", end="", file=sys.stderr)
+
+    stats = score_file(args.input, output, fmt=fmt, chunksize=args.chunksize, progress=progress)
+    print(file=sys.stderr)
+    print(f"Scored {stats['rows']:,} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/s) -> {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
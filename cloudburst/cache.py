@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+
+# In-process TTL cache shared by every page and session. Entries are evicted
+# least-recently-used once the cache is full, concurrent loads of the same
+# key are collapsed into one upstream call, and hit rates are tracked per
+# namespace (the first element of the key, e.g. the endpoint name).
+#
+# Expired entries stay in place until they are evicted or replaced: if a
+# reload raises (e.g. quota.QuotaExceeded), the last known value is served
+# instead, counted as "stale".
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _count(self, key, field):
+        ns = key[0] if isinstance(key, tuple) else key
+        stats = self._stats.setdefault(ns, {"hits": 0, "misses": 0, "coalesced": 0, "stale": 0, "evictions": 0})
+        stats[field] += 1
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def _set(self, key, value, ttl):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            old, _ = self._data.popitem(last=False)
+            self._count(old, "evictions")
+
+    def get_or_load(self, key, loader, ttl):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._data.move_to_end(key)
+                self._count(key, "hits")
+                return entry[1]
+            stale = entry[1] if entry is not None else None
+            flight = self._inflight.get(key)
+            if flight is None:
+                flight = self._inflight[key] = _Flight()
+                leader = True
+                self._count(key, "misses")
+            else:
+                leader = False
+                self._count(key, "coalesced")
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                if stale is not None:
+                    return stale
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            if stale is None:
+                raise
+            with self._lock:
+                self._count(key, "stale")
+            return stale
+        finally:
+            with self._lock:
+                # Failed lookups (loader returned None) are not cached so the
+                # next request retries upstream.
+                if flight.error is None and flight.value is not None:
+                    self._set(key, flight.value, ttl)
+                del self._inflight[key]
+            flight.done.set()
+        return flight.value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            out = {"size": len(self._data), "maxsize": self.maxsize, "namespaces": {}}
+            for ns, s in self._stats.items():
+                lookups = s["hits"] + s["misses"] + s["coalesced"]
+                out["namespaces"][ns] = dict(s, hit_rate=(s["hits"] + s["coalesced"]) / lookups if lookups else 0.0)
+            return out
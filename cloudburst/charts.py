@@ -0,0 +1,89 @@
+import hashlib
+
+from cloudburst import metrics
+from cloudburst.cache import TTLCache
+
+# Hourly forecast chart specs, built as plain Plotly dicts instead of through
+# plotly.express (~75 ms -> ~5 ms per chart) and memoized on a hash of the
+# chart frame plus the unit, so reruns with unchanged data reuse the spec.
+# The spec pins the tiny "none" template: without it Plotly embeds its ~6 KB
+# default template in every payload, which st.plotly_chart's theme overrides
+# in the browser anyway.
+
+COLORS = {
+    "Temperature": "#FF5733",
+    "Humidity": "#33C1FF",
+    "Rain Probability": "#2ECC71",
+}
+FIGURE_TTL = 3600
+
+cache = TTLCache(maxsize=256)
+
+
+def frame_digest(df):
+    import pandas as pd
+
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    digest.update("|".join(map(str, df.columns)).encode())
+    return digest.hexdigest()
+
+
+@metrics.timed("chart.build")
+def _forecast_spec(df, title):
+    x = df["Time"].tolist()
+    return {
+        "data": [
+            {
+                "type": "scatter",
+                "name": name,
+                "x": x,
+                "y": df[name].round(2).tolist(),
+                "mode": "lines+markers",
+                "line": {"color": color},
+                "hovertemplate": "%{y}",
+            }
+            for name, color in COLORS.items()
+        ],
+        "layout": {
+            "template": "none",
+            "title": {"text": title},
+            "hovermode": "x unified",
+            "xaxis": {"title": {"text": "Hour"}},
+            "yaxis": {"title": {"text": "Measurement"}},
+            "legend": {"title": {"text": "variable"}},
+        },
+    }
+
+
+def _history_spec(df, symbol):
+    x = df["Time"].tolist()
+    return {
+        "data": [
+            {"type": "scatter", "name": f"Temperature ({symbol})", "x": x, "y": df["Temperature"].round(2).tolist(),
+             "mode": "lines", "line": {"color": COLORS["Temperature"]}, "hovertemplate": "%{y}"},
+            {"type": "scatter", "name": "Humidity (%)", "x": x, "y": df["Humidity"].round(1).tolist(),
+             "mode": "lines", "line": {"color": COLORS["Humidity"]}, "hovertemplate": "%{y}"},
+            {"type": "scatter", "name": "Cloudburst predicted", "x": df.loc[df["Cloudburst"], "Time"].tolist(),
+             "y": df.loc[df["Cloudburst"], "Humidity"].round(1).tolist(), "mode": "markers",
+             "marker": {"color": "#8E44AD", "size": 10, "symbol": "diamond"}, "hovertemplate": "⚠️ %{x}"},
+        ],
+        "layout": {
+            "template": "none",
+            "title": {"text": f"Observed: Temp ({symbol}) & Humidity (%)"},
+            "hovermode": "x unified",
+            "xaxis": {"title": {"text": "Observed at"}},
+            "yaxis": {"title": {"text": "Measurement"}},
+        },
+    }
+
+
+def history_figure(df, symbol):
+    # df: Time, Temperature, Humidity, Cloudburst (see pages/1_🌦️ Weather.py)
+    key = ("history_figure", frame_digest(df), symbol)
+    return cache.get_or_load(key, lambda: _history_spec(df, symbol), FIGURE_TTL)
+
+
+def forecast_figure(df, symbol, title=None):
+    title = title or f"Forecast: Temperature ({symbol}), Humidity (%) & Rain Probability (%)"
+    key = ("forecast_figure", frame_digest(df), symbol, title)
+    return cache.get_or_load(key, lambda: _forecast_spec(df, title), FIGURE_TTL)
@@ -0,0 +1,32 @@
+import os
+import tomllib
+
+# Secrets for code that runs outside Streamlit (CLIs, background workers,
+# the API service). Environment variables win, e.g. WEATHER_API_KEY for
+# [weather] api_key; otherwise .streamlit/secrets.toml is read.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRETS_PATH = os.path.join(ROOT, ".streamlit", "secrets.toml")
+CACHE_DIR = os.environ.get("CLOUDBURST_CACHE_DIR", os.path.join(ROOT, ".cache"))
+
+_secrets = None
+
+
+def secret(section, name, default=None):
+    global _secrets
+    env = os.environ.get(f"{section}_{name}".upper())
+    if env:
+        return env
+    if _secrets is None:
+        try:
+            with open(SECRETS_PATH, "rb") as f:
+                _secrets = tomllib.load(f)
+        except FileNotFoundError:
+            _secrets = {}
+    return _secrets.get(section, {}).get(name, default)
+
+
+def cache_path(*parts):
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+# Runs a page's independent upstream calls in parallel. Dependent calls are
+# chained with then() instead of blocking a worker on their parent, and
+# results are handed back in completion order so each section can render as
+# soon as its own data is in.
+
+executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="fanout")
+
+
+def submit(fn, *args, **kwargs):
+    return executor.submit(fn, *args, **kwargs)
+
+
+def resolved(value):
+    # An already finished future, for data a page has from an earlier run.
+    f = Future()
+    f.set_result(value)
+    return f
+
+
+def then(parent, fn):
+    child = Future()
+
+    def start(done):
+        if done.exception() is not None:
+            child.set_exception(done.exception())
+            return
+        inner = executor.submit(fn, done.result())
+        inner.add_done_callback(lambda f: child.set_exception(f.exception()) if f.exception() else child.set_result(f.result()))
+
+    parent.add_done_callback(start)
+    return child
+
+
+def as_ready(futures, deadline):
+    # futures: {name: Future}. Yields (name, result, error); anything still
+    # pending at the deadline is yielded with a TimeoutError and left to
+    # finish in the background.
+    pending = {f: name for name, f in futures.items()}
+    stop = time.monotonic() + deadline
+    while pending:
+        remaining = stop - time.monotonic()
+        if remaining <= 0:
+            break
+        done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for f in done:
+            name = pending.pop(f)
+            if f.exception() is not None:
+                yield name, None, f.exception()
+            else:
+                yield name, f.result(), None
+    for f, name in pending.items():
+        yield name, None, TimeoutError(f"{name} did not finish within {deadline}s")
@@ -0,0 +1,44 @@
+from datetime import timedelta, timezone
+
+from cloudburst import metrics
+
+# Hourly forecast as a typed columnar frame, shared by the home page and the
+# Weather page. The upstream JSON list is parsed in one vectorized pass when
+# it is fetched and the frame is cached with the rest of the weather report,
+# so rendering a different window never re-parses it.
+
+# Source field -> column. One Call "hourly" items are flat; the 2.5 forecast
+# "list" nests temperature and humidity under "main".
+FIELDS = {
+    "onecall": {"dt": "dt", "temp": "temp", "humidity": "humidity", "pop": "pop"},
+    "forecast": {"dt": "dt", "main.temp": "temp", "main.humidity": "humidity", "pop": "pop"},
+}
+DTYPES = {"temp": "float64", "humidity": "float64", "pop": "float64"}
+
+
+@metrics.timed("forecast.parse")
+def parse_hourly(items, tz_offset=0, source="onecall"):
+    import pandas as pd  # deferred: pages that never show a forecast skip the ~0.5 s import
+
+    fields = FIELDS[source]
+    df = pd.json_normalize(items)
+    df = df.reindex(columns=list(fields)).rename(columns=fields)
+    df["pop"] = df["pop"].fillna(0)
+    df = df.astype(DTYPES)
+    tz = timezone(timedelta(seconds=tz_offset))
+    df.insert(0, "time", pd.to_datetime(df.pop("dt"), unit="s", utc=True).dt.tz_convert(tz))
+    return df
+
+
+def chart_frame(hourly, hours=24):
+    # Columns and labels used by the "Hourly Forecast" charts; times are the
+    # city's local time.
+    import pandas as pd
+
+    window = hourly[hourly["time"] < hourly["time"].iloc[0] + pd.Timedelta(hours=hours)] if len(hourly) else hourly
+    return pd.DataFrame({
+        "Time": window["time"].dt.strftime("%I %p"),
+        "Temperature": window["temp"],
+        "Humidity": window["humidity"],
+        "Rain Probability": window["pop"] * 100,
+    })
@@ -0,0 +1,183 @@
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from cloudburst.config import cache_path
+
+# Persistent lookup cache for client IP -> city and normalized city name ->
+# coordinates. Lives in SQLite so it survives restarts; rows expire after a
+# TTL and the least recently used rows are dropped beyond MAX_ROWS per table.
+
+DB_PATH = os.environ.get("GEO_CACHE_PATH") or cache_path("geo.sqlite3")
+MAX_ROWS = int(os.environ.get("GEO_CACHE_MAX_ROWS", 50_000))
+IP_TTL = 24 * 3600
+PLACE_TTL = 30 * 24 * 3600
+
+# Used to pad `warm --top N` when fewer cities have been looked up so far.
+DEFAULT_CITIES = [
+    "Mumbai", "Delhi", "Bengaluru", "Kolkata", "Chennai", "Hyderabad", "Pune", "Ahmedabad",
+    "Jaipur", "Lucknow", "Dehradun", "Shimla", "Manali", "Srinagar", "Leh", "Darjeeling",
+    "Gangtok", "Guwahati", "Kathmandu", "Dhaka", "Karachi", "Dubai", "Singapore", "London",
+    "New York", "Tokyo", "Sydney", "Paris", "Los Angeles", "Toronto",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ip_city (
+    ip TEXT PRIMARY KEY,
+    city TEXT NOT NULL,
+    expires REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS place (
+    query TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    country TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL,
+    expires REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ip_city_last_used ON ip_city (last_used);
+CREATE INDEX IF NOT EXISTS place_last_used ON place (last_used);
+CREATE INDEX IF NOT EXISTS place_hits ON place (hits);
+"""
+
+
+class GeoStore:
+    def __init__(self, path=DB_PATH, max_rows=MAX_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _touch(self, table, column, key):
+        self._conn.execute(f"UPDATE {table} SET last_used = ?, hits = hits + 1 WHERE {column} = ?",
+                           (time.time(), key))
+
+    def _evict(self, table):
+        # Drop expired rows, then the least recently used beyond max_rows.
+        self._conn.execute(f"DELETE FROM {table} WHERE expires < ?", (time.time(),))
+        self._conn.execute(
+            f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    def get_city(self, ip):
+        with self._lock:
+            row = self._conn.execute("SELECT city FROM ip_city WHERE ip = ? AND expires >= ?",
+                                     (ip, time.time())).fetchone()
+            if row:
+                self._touch("ip_city", "ip", ip)
+            return row[0] if row else None
+
+    def put_city(self, ip, city, ttl=IP_TTL):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO ip_city (ip, city, expires, last_used, hits) VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT(ip) DO UPDATE SET city = excluded.city, expires = excluded.expires, "
+                "last_used = excluded.last_used",
+                (ip, city, now + ttl, now),
+            )
+            self._evict("ip_city")
+
+    def get_place(self, query):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, country, lat, lon FROM place WHERE query = ? AND expires >= ?",
+                (query, time.time()),
+            ).fetchone()
+            if row:
+                self._touch("place", "query", query)
+            return row
+
+    def put_place(self, query, name, country, lat, lon, ttl=PLACE_TTL):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO place (query, name, country, lat, lon, expires, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 1) "
+                "ON CONFLICT(query) DO UPDATE SET name = excluded.name, country = excluded.country, "
+                "lat = excluded.lat, lon = excluded.lon, expires = excluded.expires, last_used = excluded.last_used",
+                (query, name, country, lat, lon, now + ttl, now),
+            )
+            self._evict("place")
+
+    def top_queries(self, n):
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT query FROM place ORDER BY hits DESC LIMIT ?", (n,))]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM ip_city")
+            self._conn.execute("DELETE FROM place")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "ip_city": self._conn.execute("SELECT COUNT(*) FROM ip_city").fetchone()[0],
+                "place": self._conn.execute("SELECT COUNT(*) FROM place").fetchone()[0],
+            }
+
+
+store = GeoStore()
+
+
+def warm(cities, api_key):
+    from cloudburst import owm, quota
+
+    loaded = 0
+    for query in cities:
+        # Refresh from upstream so warmed rows get a full TTL again.
+        try:
+            place = owm.fetch_place(query, api_key)
+        except quota.QuotaExceeded:
+            # Leave the remaining budget for visitors
+            break
+        if place:
+            store.put_place(query, place.name, place.country, place.lat, place.lon)
+            loaded += 1
+    return loaded
+
+
+def main(argv=None):
+    from cloudburst import owm
+    from cloudburst.config import secret
+
+    parser = argparse.ArgumentParser(prog="python -m cloudburst.geo_store",
+                                     description="Inspect or pre-warm the persistent geocoding cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_warm = sub.add_parser("warm", help="geocode the most requested cities (and any given ones)")
+    p_warm.add_argument("--top", type=int, default=50)
+    p_warm.add_argument("--file", help="text file with one city per line")
+    p_warm.add_argument("cities", nargs="*")
+    sub.add_parser("stats", help="print row counts")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        print(store.stats())
+        return 0
+
+    cities = list(args.cities)
+    if args.file:
+        with open(args.file) as f:
+            cities += [line.strip() for line in f if line.strip()]
+    top = store.top_queries(args.top)
+    top += [c.lower() for c in DEFAULT_CITIES if c.lower() not in top][:max(args.top - len(top), 0)]
+    cities = list(dict.fromkeys(owm.normalize_location(c) for c in cities + top))
+
+    loaded = warm(cities, secret("weather", "api_key"))
+    print(f"Warmed {loaded}/{len(cities)} cities into {store.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
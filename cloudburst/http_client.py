@@ -0,0 +1,120 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
+
+from cloudburst import metrics
+
+# One HTTP client for the whole process. The adapter (and its per-host
+# keep-alive connection pools) is shared by every thread, so repeat calls to
+# openweathermap.org, newsapi.org and ipinfo.io reuse warm TLS connections.
+# Sessions are kept per thread since requests.Session itself is not
+# guaranteed thread-safe.
+#
+# Retries (and Retry-After waits) stop at a per-call deadline: no retry
+# starts more than HTTP_DEADLINE seconds after get() was called, so a call
+# returns within that plus one attempt's timeout (DEFAULT_TIMEOUT, ~8 s),
+# e.g. ~16 s worst case with the defaults instead of RETRIES x (timeout +
+# backoff). Interactive callers can pass a smaller deadline=.
+#
+# Metered callers pass on_retry=, called before every retry attempt; it
+# returns False to stop retrying (e.g. the quota is spent), in which case the
+# last response (or connection error) is returned as if retries ran out.
+
+POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", 10))  # distinct hosts kept pooled
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 32))  # connections per host
+RETRIES = int(os.environ.get("HTTP_RETRIES", 3))
+BACKOFF_FACTOR = float(os.environ.get("HTTP_BACKOFF_FACTOR", 0.3))
+BACKOFF_MAX = float(os.environ.get("HTTP_BACKOFF_MAX", 5))
+RETRY_AFTER_MAX = float(os.environ.get("HTTP_RETRY_AFTER_MAX", 10))
+DEADLINE = float(os.environ.get("HTTP_DEADLINE", 8))
+DEFAULT_TIMEOUT = (3.05, 5)
+
+_local = threading.local()
+
+
+def _remaining():
+    # Seconds left before the current thread's get() deadline, or None
+    deadline = getattr(_local, "deadline", None)
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class _Retry(Retry):
+    # Honour Retry-After up to RETRY_AFTER_MAX seconds, and never wait or
+    # retry past the deadline of the get() being served.
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        new = super().increment(method, url, response, error, _pool, _stacktrace)
+        on_retry = getattr(_local, "on_retry", None)
+        if on_retry is not None and not on_retry():
+            raise MaxRetryError(_pool, url, error or "retry not allowed by caller")
+        return new
+
+    def is_exhausted(self):
+        remaining = _remaining()
+        return super().is_exhausted() or (remaining is not None and remaining <= 0)
+
+    def sleep(self, response=None):
+        delay = self.get_retry_after(response) if self.respect_retry_after_header and response else None
+        if delay is None:
+            delay = self.get_backoff_time()
+        remaining = _remaining()
+        if remaining is not None:
+            delay = min(delay, remaining)
+        if delay > 0:
+            time.sleep(delay)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, RETRY_AFTER_MAX)
+
+    def get_backoff_time(self):
+        # Full jitter: spread retries from concurrent sessions apart.
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff else 0
+
+
+retry = _Retry(
+    total=RETRIES,
+    backoff_factor=BACKOFF_FACTOR,
+    backoff_max=BACKOFF_MAX,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "HEAD"}),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+
+def session():
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = requests.Session()
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        _local.session = s
+    return s
+
+
+def get(url, deadline=DEADLINE, on_retry=None, **kwargs):
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    host = urlsplit(url).hostname
+    _local.deadline = time.monotonic() + deadline
+    _local.on_retry = on_retry
+    with metrics.timed("http.get", upstream=host):
+        try:
+            res = session().get(url, **kwargs)
+        except requests.RequestException as e:
+            metrics.inc("upstream_responses", upstream=host, status=type(e).__name__)
+            raise
+        finally:
+            _local.deadline = None
+            _local.on_retry = None
+    metrics.inc("upstream_responses", upstream=host, status=str(res.status_code))
+    return res
@@ -0,0 +1,236 @@
+import functools
+import sys
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cloudburst.config import secret
+
+# In-process timings and counters for the hot paths, exported in Prometheus
+# text format. Wrap a stage with `with metrics.timed("owm.parse"):` or
+# decorate a function with `@metrics.timed("chart.build")`; each observation
+# is a perf_counter() pair, a bisect and a locked increment (~1 µs).
+#
+# Streamlit can't serve extra routes, so the page process exposes /metrics
+# on its own small HTTP server when [metrics] port is set (or METRICS_PORT);
+# the JSON API serves it at GET /metrics. Cache, quota and session numbers
+# are read from their modules at scrape time.
+
+# Seconds; covers a cache hit (~µs) up to a slow upstream with retries.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_server = None
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        # Linear interpolation inside the bucket, as histogram_quantile() does.
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+def _key(name, labels):
+    # Label values are strings, as in the exposition format, so keys always sort
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def observe(stage, seconds, **labels):
+    key = _key(stage, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.observe(seconds)
+
+
+def inc(name, amount=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+class timed:
+    # Context manager and decorator. As a decorator every call gets its own
+    # timer, so it is safe on functions called from several threads.
+    def __init__(self, stage, **labels):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.stage, time.perf_counter() - self._start, **self.labels)
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(self.stage, **self.labels):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+
+def page_run(st, page):
+    # Called once per script run; the first run of a browser session also
+    # counts a new session, so page_runs / sessions is runs per session.
+    if "_metrics_session" not in st.session_state:
+        st.session_state["_metrics_session"] = True
+        inc("sessions")
+    inc("page_runs", page=page)
+
+
+# --- Snapshots ---
+def stages():
+    # {(stage, labels): {"count", "mean", "p50", "p95"}} in seconds
+    with _lock:
+        items = [(key, hist.count, hist.sum, hist.quantile(0.5), hist.quantile(0.95))
+                 for key, hist in _histograms.items()]
+    return {key: {"count": count, "mean": total / count if count else None, "p50": p50, "p95": p95}
+            for key, count, total, p50, p95 in items}
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def _cache_stats():
+    # Only modules the process has already imported; a scrape never loads any.
+    out = {}
+    for cache, module, fn in (("owm", "cloudburst.owm", "cache_stats"),
+                              ("charts", "cloudburst.charts", None),
+                              ("predict", "cloudburst.predict", "cache_stats")):
+        mod = sys.modules.get(module)
+        if mod is not None:
+            out[cache] = getattr(mod, fn)() if fn else mod.cache.stats()
+    return out
+
+
+def _quota_stats():
+    mod = sys.modules.get("cloudburst.quota")
+    return mod.stats() if mod else {}
+
+
+# --- Prometheus text format ---
+def _labels(pairs):
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render():
+    lines = ["# HELP cloudburst_stage_seconds Latency of instrumented stages.",
+             "# TYPE cloudburst_stage_seconds histogram"]
+    with _lock:
+        histograms = [(key, list(h.counts), h.sum, h.count, h.buckets) for key, h in sorted(_histograms.items())]
+        counts = sorted(_counters.items())
+
+    for (stage, labels), bucket_counts, total, count, buckets in histograms:
+        base = (("stage", stage),) + labels
+        cumulative = 0
+        for bound, n in zip(buckets + (float("inf"),), bucket_counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"cloudburst_stage_seconds_bucket{_labels(base + (('le', le),))} {cumulative}")
+        lines.append(f"cloudburst_stage_seconds_sum{_labels(base)} {total}")
+        lines.append(f"cloudburst_stage_seconds_count{_labels(base)} {count}")
+
+    families = {}
+    for (name, labels), value in counts:
+        families.setdefault(name, []).append((labels, value))
+    for name, series in families.items():
+        lines.append(f"# TYPE cloudburst_{name}_total counter")
+        lines.extend(f"cloudburst_{name}_total{_labels(labels)} {value}" for labels, value in series)
+
+    caches = _cache_stats()
+    if caches:
+        lines.append("# TYPE cloudburst_cache_requests_total counter")
+        for cache, stats in caches.items():
+            for ns, ns_stats in stats.get("namespaces", {"all": stats}).items():
+                for result in ("hits", "misses", "coalesced", "stale"):
+                    if result in ns_stats:
+                        labels = (("cache", cache), ("namespace", ns), ("result", result))
+                        lines.append(f"cloudburst_cache_requests_total{_labels(labels)} {ns_stats[result]}")
+        lines.append("# TYPE cloudburst_cache_entries gauge")
+        lines.extend(f"cloudburst_cache_entries{_labels((('cache', cache),))} {stats['size']}"
+                     for cache, stats in caches.items())
+
+    quotas = _quota_stats()
+    if quotas:
+        lines.append("# TYPE cloudburst_quota_remaining_today gauge")
+        lines.extend(f"cloudburst_quota_remaining_today{_labels((('upstream', name),))} {q['remaining_today']}"
+                     for name, q in quotas.items())
+        lines.append("# TYPE cloudburst_quota_throttled_total counter")
+        lines.extend(f"cloudburst_quota_throttled_total{_labels((('upstream', name),))} {q['throttled']}"
+                     for name, q in quotas.items())
+    return "\n".join(lines) + "\n"
+
+
+# --- /metrics server for the Streamlit process ---
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="0.0.0.0"):
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+def start_server():
+    # Once per process, and only when a port is configured.
+    global _server
+    port = secret("metrics", "port")
+    if not port or _server is not None:
+        return _server
+    with _lock:
+        if _server is None:
+            try:
+                _server = serve(int(port), secret("metrics", "host", "0.0.0.0"))
+            except OSError:
+                # Another process (e.g. a second server worker) holds the port
+                _server = False
+    return _server
+
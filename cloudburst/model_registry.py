@@ -0,0 +1,136 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+# Shared by every page and session of the server process. Pages only run
+# their own script on each rerun, imported modules stay loaded, so the model
+# is unpickled once and kept in memory until the file on disk changes.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PICKLE_PATH = os.path.join(ROOT, "cbmodel.pkl")
+PARAMS_PATH = os.path.join(ROOT, "cbmodel.npz")
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _load_params(path):
+    from cloudburst.scorer import NBScorer
+
+    return NBScorer.load(path)
+
+
+def _load_pickle_as_params(path):
+    # The pickle is the source of truth. Its .npz export (same name, next to
+    # it) is used while it records the pickle's sha256; a new pickle is
+    # re-exported once, so only that load pays for the sklearn import.
+    from cloudburst.scorer import NBScorer, source_sha256
+
+    sha = _file_sha256(path)
+    params_path = os.path.splitext(path)[0] + ".npz"
+    if source_sha256(params_path) == sha:
+        return NBScorer.load(params_path)
+
+    model = _load_pickle(path)
+    if not hasattr(model, "feature_log_prob_"):
+        # Not a BernoulliNB; serve the pickled estimator as is
+        return model
+    scorer = NBScorer.from_sklearn(model)
+    try:
+        scorer.save(params_path, source=os.path.basename(path), source_sha256=sha)
+    except OSError:
+        # Read-only checkout: score from memory, export again next load
+        pass
+    return scorer
+
+
+def load_model_file(path):
+    # The exported .npz is scored with NumPy alone; a pickle goes through
+    # its (re-)exported .npz when it is a BernoulliNB.
+    if path.endswith(".npz"):
+        return _load_params(path)
+    return _load_pickle_as_params(path)
+
+
+class ModelRegistry:
+    def __init__(self, path, loader=load_model_file):
+        self.path = path
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._current = (None, {})
+        self._stat = None
+
+    def get(self):
+        return self.get_with_info()[0]
+
+    def get_with_info(self):
+        # (model, info) read as one pair, so callers never see a model next
+        # to another model's version during a hot swap.
+        # A stat() per call is cheap; the file is only re-read when its
+        # mtime/size change, and only swapped in when the content hash differs.
+        st = os.stat(self.path)
+        stat = (st.st_mtime_ns, st.st_size)
+        current = self._current
+        if current[0] is not None and stat == self._stat:
+            return current
+
+        with self._lock:
+            current = self._current
+            if current[0] is not None and stat == self._stat:
+                return current
+            sha = _file_sha256(self.path)
+            if current[0] is not None and sha == current[1].get("sha256"):
+                self._stat = stat
+                return current
+
+            start = time.perf_counter()
+            model = self.loader(self.path)
+            elapsed = time.perf_counter() - start
+
+            # Readers that already hold the old model keep using it; new
+            # calls get the new one, so a swap never blocks a prediction.
+            info = {
+                "path": self.path,
+                "version": sha[:12],
+                "sha256": sha,
+                "loaded_at": datetime.now().isoformat(timespec="seconds"),
+                "load_seconds": elapsed,
+                "loads": current[1].get("loads", 0) + 1,
+            }
+            self._current = (model, info)
+            self._stat = stat
+            return self._current
+
+    def info(self):
+        return dict(self._current[1])
+
+
+# The pickle is watched when present, so dropping in a new cbmodel.pkl is
+# picked up (and exported) without touching the .npz by hand.
+MODEL_PATH = os.environ.get("CLOUDBURST_MODEL") or (PICKLE_PATH if os.path.exists(PICKLE_PATH) else PARAMS_PATH)
+registry = ModelRegistry(MODEL_PATH)
+
+
+def get_model():
+    return registry.get()
+
+
+def get_model_with_info():
+    return registry.get_with_info()
+
+
+def model_info():
+    return registry.info()
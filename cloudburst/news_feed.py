@@ -0,0 +1,108 @@
+import threading
+import time
+from dataclasses import dataclass
+
+from cloudburst import http_client, metrics, quota
+from cloudburst.config import secret
+
+# Top weather headlines are the same for every visitor, so one background
+# thread per process polls newsapi.org and page renders only read the latest
+# snapshot. On upstream failures the last good articles are kept and the
+# poller backs off exponentially.
+
+NEWS_API = secret("upstream", "news_url", "https://newsapi.org")
+NEWS_URL = f"{NEWS_API}/v2/top-headlines"
+POLL_INTERVAL = 15 * 60
+STALE_AFTER = 2 * POLL_INTERVAL
+RETRY_MIN = 30
+RETRY_MAX = 2 * 3600
+
+
+@dataclass(frozen=True)
+class Article:
+    title: str
+    url: str
+    description: str
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    articles: tuple = ()
+    fetched_at: float = 0.0
+    error: str = ""
+    failures: int = 0
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at if self.fetched_at else None
+
+    @property
+    def stale(self):
+        return not self.fetched_at or self.age > STALE_AFTER or bool(self.error)
+
+
+class NewsFeed:
+    def __init__(self, api_key, interval=POLL_INTERVAL, page_size=4):
+        self.api_key = api_key
+        self.interval = interval
+        self.page_size = page_size
+        self._snapshot = Snapshot()
+        self._first_attempt = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="news-feed", daemon=True)
+                self._thread.start()
+        return self
+
+    def snapshot(self, wait=0):
+        # Only the very first render after startup may wait, and only until
+        # the first poll finishes.
+        if wait and not self._first_attempt.is_set():
+            self._first_attempt.wait(wait)
+        return self._snapshot
+
+    def refresh(self):
+        self._wake.set()
+
+    def _fetch(self):
+        quota.acquire("news")
+        params = {"q": "weather", "language": "en", "pageSize": self.page_size, "apiKey": self.api_key}
+        res = http_client.get(NEWS_URL, params=params)
+        with metrics.timed("news.parse"):
+            data = res.json()
+        if res.status_code != 200 or "articles" not in data:
+            raise RuntimeError(data.get("message") or f"HTTP {res.status_code}")
+        return tuple(Article(a.get("title") or "", a.get("url") or "", a.get("description") or "")
+                     for a in data["articles"])
+
+    def _run(self):
+        while True:
+            try:
+                articles = self._fetch()
+                self._snapshot = Snapshot(articles, time.time())
+                delay = self.interval
+            except Exception as e:
+                old = self._snapshot
+                failures = old.failures + 1
+                self._snapshot = Snapshot(old.articles, old.fetched_at, str(e) or type(e).__name__, failures)
+                delay = min(RETRY_MIN * 2 ** (failures - 1), RETRY_MAX)
+            self._first_attempt.set()
+            self._wake.wait(delay)
+            self._wake.clear()
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def get_feed(api_key):
+    with _feeds_lock:
+        feed = _feeds.get(api_key)
+        if feed is None:
+            feed = _feeds[api_key] = NewsFeed(api_key).start()
+        return feed
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from cloudburst.config import cache_path
+from cloudburst.predict import FEATURES, features_from_current
+
+# Append-only record of every weather report fetched from upstream: one row
+# per location and observation time with the model's seven features (model
+# units: °C, humidity fraction, km/h, degrees, km, hPa) plus what a page needs
+# to show it again, and each report's hourly forecast as a snapshot keyed on
+# the observation it came with. Rows are never updated; refetching the same
+# observation is a no-op.
+#
+# Tables are clustered on (location, time), so a city's history for any
+# range is one index scan. Uses: history charts, retrospective scoring and
+# a fallback when upstreams are down or out of quota (owm.weather_report).
+#
+#   python -m cloudburst.observations score --city Shimla --days 7
+#   python -m cloudburst.observations export --out observations/   (Parquet, by city/day)
+
+DB_PATH = os.environ.get("OBSERVATIONS_PATH") or cache_path("observations.sqlite3")
+FALLBACK_MAX_AGE = 6 * 3600
+HISTORY_DAYS = 7
+
+# Column per model feature, in FEATURES order
+COLUMNS = ["temp", "apparent_temp", "humidity", "wind_speed", "wind_bearing", "visibility", "pressure"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observation (
+    loc TEXT NOT NULL,
+    dt INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    temp REAL NOT NULL,
+    apparent_temp REAL NOT NULL,
+    humidity REAL NOT NULL,
+    wind_speed REAL NOT NULL,
+    wind_bearing REAL NOT NULL,
+    visibility REAL NOT NULL,
+    pressure REAL NOT NULL,
+    main TEXT NOT NULL,
+    description TEXT NOT NULL,
+    icon TEXT NOT NULL,
+    sunrise INTEGER NOT NULL,
+    sunset INTEGER NOT NULL,
+    tz_offset INTEGER NOT NULL,
+    PRIMARY KEY (loc, dt)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS forecast (
+    loc TEXT NOT NULL,
+    issued INTEGER NOT NULL,
+    dt INTEGER NOT NULL,
+    temp REAL NOT NULL,
+    humidity REAL NOT NULL,
+    pop REAL NOT NULL,
+    PRIMARY KEY (loc, issued, dt)
+) WITHOUT ROWID;
+"""
+
+
+def location_key(lat, lon):
+    # Same 0.01° grid as the weather cache keys
+    return f"{float(lat):.2f},{float(lon):.2f}"
+
+
+class ObservationStore:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # loc -> last recorded observation time, so cached renders skip the write
+        self._recorded = {}
+
+    def record(self, report):
+        place, current = report.place, report.current
+        loc = location_key(place.lat, place.lon)
+        if self._recorded.get(loc) == current.dt:
+            return False
+        features = features_from_current(current, report.units)
+        hourly = report.hourly
+        forecast_rows = []
+        if len(hourly):
+            temps = hourly["temp"] if report.units == "metric" else (hourly["temp"] - 32) * 5 / 9
+            forecast_rows = list(zip(
+                [loc] * len(hourly), [current.dt] * len(hourly),
+                (hourly["time"].astype("int64") // 10**9).tolist(), temps.tolist(),
+                (hourly["humidity"] / 100).tolist(), hourly["pop"].tolist(),
+            ))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                f"INSERT OR IGNORE INTO observation VALUES ({', '.join('?' * 16)})",
+                (loc, current.dt, place.name, *features, current.main, current.description, current.icon,
+                 current.sunrise, current.sunset, report.tz_offset),
+            )
+            self._conn.executemany("INSERT OR IGNORE INTO forecast VALUES (?, ?, ?, ?, ?, ?)", forecast_rows)
+            self._conn.execute("COMMIT")
+            self._recorded[loc] = current.dt
+        return True
+
+    def latest(self, lat, lon, max_age=FALLBACK_MAX_AGE):
+        # (observation dict, [(dt, temp, humidity, pop), ...] from its
+        # forecast snapshot) or None when nothing recent enough is stored.
+        loc = location_key(lat, lon)
+        with self._lock:
+            cur = self._conn.execute("SELECT * FROM observation WHERE loc = ? AND dt >= ? ORDER BY dt DESC LIMIT 1",
+                                     (loc, int(time.time() - max_age)))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            observation = dict(zip([c[0] for c in cur.description], row))
+            forecast = self._conn.execute(
+                "SELECT dt, temp, humidity, pop FROM forecast WHERE loc = ? AND issued = ? ORDER BY dt",
+                (loc, observation["dt"]),
+            ).fetchall()
+        return observation, forecast
+
+    def history(self, lat, lon, start=None, end=None):
+        # Observations in [start, end) (unix seconds) as a DataFrame, oldest first
+        import pandas as pd
+
+        start = int(time.time() - HISTORY_DAYS * 86400) if start is None else int(start)
+        end = int(time.time() + 1) if end is None else int(end)
+        with self._lock:
+            cur = self._conn.execute(
+                f"SELECT dt, tz_offset, {', '.join(COLUMNS)}, main FROM observation "
+                "WHERE loc = ? AND dt >= ? AND dt < ? ORDER BY dt",
+                (location_key(lat, lon), start, end),
+            )
+            rows = cur.fetchall()
+            columns = [c[0] for c in cur.description]
+        return pd.DataFrame(rows, columns=columns)
+
+    def score(self, lat, lon, start=None, end=None):
+        # Retrospective predictions over stored observations, one vectorized call
+        from cloudburst.model_registry import get_model
+
+        df = self.history(lat, lon, start, end)
+        if len(df):
+            prediction = get_model().predict(df[COLUMNS].to_numpy())
+            df = df.assign(Prediction=prediction, Cloudburst=prediction == 1)
+        return df
+
+    def frame(self):
+        import pandas as pd
+
+        with self._lock:
+            return pd.read_sql_query("SELECT * FROM observation ORDER BY loc, dt", self._conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "locations": self._conn.execute("SELECT COUNT(DISTINCT loc) FROM observation").fetchone()[0],
+                "observations": self._conn.execute("SELECT COUNT(*) FROM observation").fetchone()[0],
+                "forecast_rows": self._conn.execute("SELECT COUNT(*) FROM forecast").fetchone()[0],
+            }
+
+
+store = ObservationStore()
+
+
+def history_frame(scored, units="metric"):
+    # Columns for charts.history_figure; times in the place's local time.
+    import pandas as pd
+
+    tz_offset = pd.to_timedelta(scored["tz_offset"], unit="s")
+    temp = scored["temp"] if units == "metric" else scored["temp"] * 9 / 5 + 32
+    return pd.DataFrame({
+        "Time": (pd.to_datetime(scored["dt"], unit="s") + tz_offset).dt.strftime("%d %b %H:%M"),
+        "Temperature": temp,
+        "Humidity": scored["humidity"] * 100,
+        "Cloudburst": scored["Cloudburst"],
+    })
+
+
+def export(out_dir):
+    # Parquet dataset partitioned as city=<name>/day=<YYYY-MM-DD>/ (UTC days)
+    import pandas as pd
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    df = store.frame()
+    if not len(df):
+        return 0
+    df["city"] = df["name"].where(df["name"] != "", df["loc"])
+    df["day"] = pd.to_datetime(df["dt"], unit="s", utc=True).dt.strftime("%Y-%m-%d")
+    df.to_parquet(out_dir, partition_cols=["city", "day"], index=False)
+    return len(df)
+
+
+def main(argv=None):
+    import pandas as pd
+
+    from cloudburst import owm, quota
+    from cloudburst.config import secret
+
+    parser = argparse.ArgumentParser(prog="python -m cloudburst.observations",
+                                     description="Query, score or export the local observation store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="row counts")
+    for name, help_text in (("history", "stored observations for a city"),
+                            ("score", "retrospective cloudburst predictions for a city")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--city", required=True)
+        p.add_argument("--days", type=float, default=HISTORY_DAYS)
+    p_export = sub.add_parser("export", help="write a Parquet dataset partitioned by city and day")
+    p_export.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        print(json.dumps(store.stats()))
+        return 0
+    if args.command == "export":
+        rows = export(args.out)
+        print(f"Exported {rows:,} observations to {args.out}")
+        return 0
+
+    try:
+        place = owm.geocode(args.city, secret("weather", "api_key"))
+    except quota.QuotaExceeded as e:
+        print(f"Cannot look up {args.city}: {e}; try again later", file=sys.stderr)
+        return 1
+    if place is None:
+        print(f"Unknown city: {args.city}", file=sys.stderr)
+        return 1
+    start = time.time() - args.days * 86400
+    fn = store.history if args.command == "history" else store.score
+    df = fn(place.lat, place.lon, start)
+    if not len(df):
+        print(f"No observations stored for {place.name or args.city} in the last {args.days:g} days")
+        return 0
+    df.insert(0, "time", pd.to_datetime(df.pop("dt"), unit="s", utc=True))
+    print(df.drop(columns=["tz_offset"]).rename(columns=dict(zip(COLUMNS, FEATURES))).to_string(index=False))
+    if args.command == "score":
+        print(f"\nCloudburst predicted for {int(df['Cloudburst'].sum())} of {len(df)} observations")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
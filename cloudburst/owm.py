@@ -0,0 +1,326 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+
+import requests
+
+from cloudburst import forecast, geo_store, http_client, metrics, observations, quota
+from cloudburst.cache import TTLCache
+from cloudburst.config import secret
+from cloudburst.predict import MS_TO_KMH
+
+# OpenWeatherMap data access shared by the home page and the Weather page.
+#
+# A view needs current conditions plus the next 24h. The city is geocoded
+# once (cached for a week), then a single One Call request by coordinates
+# returns both. Keys without a One Call subscription get a 401, in which case
+# the 2.5 weather + forecast pair is used instead, still by coordinates.
+# Responses are parsed straight into the small records below and only those
+# are cached, keyed on (endpoint, normalized city or coords, units).
+# Every upstream call spends from the shared "weather" quota; when it is
+# exhausted, expired cache entries are served instead. Fetched reports are
+# appended to the local observation store, which also answers when
+# upstream is unavailable and nothing is cached. Only when none of these
+# has anything does weather_report() raise quota.QuotaExceeded, so callers
+# can tell "rate limited" apart from "city not found" (None).
+
+# Overridable ([upstream] owm_url or UPSTREAM_OWM_URL), e.g. for benchmarks
+API_URL = secret("upstream", "owm_url", "https://api.openweathermap.org")
+TIMEOUT = 5
+HOURS = 24
+
+TTLS = {
+    "geocode": 7 * 24 * 3600,
+    "onecall": 10 * 60,
+    "weather": 10 * 60,
+    "forecast": 30 * 60,
+}
+ONECALL_RETRY = 3600
+MPH_PER_MS = 2.2369363
+
+cache = TTLCache(maxsize=2048)
+
+_onecall_lock = threading.Lock()
+_onecall_disabled_until = 0.0
+_local = threading.local()
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    country: str
+    lat: float
+    lon: float
+
+
+@dataclass(frozen=True)
+class Current:
+    dt: int
+    temp: float
+    feels_like: float
+    humidity: float
+    pressure: float
+    wind_speed: float
+    wind_deg: float
+    visibility: float
+    main: str
+    description: str
+    icon: str
+    sunrise: int
+    sunset: int
+
+
+@dataclass(frozen=True)
+class Report:
+    place: Place
+    units: str
+    tz_offset: int
+    current: Current
+    hourly: object  # pandas DataFrame, see cloudburst.forecast.parse_hourly
+    stale: bool = False  # served from the observation store, upstream unavailable
+
+
+def normalize_location(location):
+    if isinstance(location, (tuple, list)):
+        lat, lon = location
+        return (round(float(lat), 2), round(float(lon), 2))
+    return " ".join(str(location).split()).lower()
+
+
+@contextmanager
+def paced(wait):
+    # Calls wait() before every upstream request this thread makes inside
+    # the block (geocode and weather alike, retries included); cache hits
+    # don't wait.
+    _local.pace = wait
+    try:
+        yield
+    finally:
+        _local.pace = None
+
+
+def _attempt():
+    # Paces and charges one upstream request; False when throttled
+    pace = getattr(_local, "pace", None)
+    if pace is not None:
+        pace()
+    return quota.try_acquire("weather")
+
+
+def _fetch(path, params):
+    # Returns (status, json or None). Network errors count as status 0;
+    # raises quota.QuotaExceeded without calling upstream when throttled.
+    # Retries are charged too and stop when the quota runs out.
+    if not _attempt():
+        raise quota.QuotaExceeded("weather API quota exhausted")
+    try:
+        res = http_client.get(f"{API_URL}{path}", params=params, timeout=TIMEOUT, on_retry=_attempt)
+    except requests.RequestException:
+        return 0, None
+    if res.status_code != 200:
+        return res.status_code, None
+    with metrics.timed("owm.parse"):
+        return 200, res.json()
+
+
+# --- Parsing: keep only the fields the pages render ---
+def _current_from_onecall(c):
+    w = c["weather"][0]
+    return Current(
+        dt=c["dt"], temp=c["temp"], feels_like=c["feels_like"], humidity=c["humidity"],
+        pressure=c["pressure"], wind_speed=c["wind_speed"], wind_deg=c.get("wind_deg", 0),
+        visibility=c.get("visibility", 10000), main=w["main"], description=w["description"],
+        icon=w["icon"], sunrise=c.get("sunrise", 0), sunset=c.get("sunset", 0),
+    )
+
+
+def _current_from_weather(d):
+    w = d["weather"][0]
+    main = d["main"]
+    return Current(
+        dt=d["dt"], temp=main["temp"], feels_like=main["feels_like"], humidity=main["humidity"],
+        pressure=main["pressure"], wind_speed=d["wind"]["speed"], wind_deg=d["wind"].get("deg", 0),
+        visibility=d.get("visibility", 10000), main=w["main"], description=w["description"],
+        icon=w["icon"], sunrise=d["sys"].get("sunrise", 0), sunset=d["sys"].get("sunset", 0),
+    )
+
+
+def _hourly_from_onecall(items, tz_offset):
+    return forecast.parse_hourly(items[:HOURS], tz_offset, "onecall")
+
+
+def _hourly_from_forecast(items, tz_offset):
+    # 3-hourly steps, so HOURS // 3 entries cover the same window
+    return forecast.parse_hourly(items[:HOURS // 3], tz_offset, "forecast")
+
+
+# --- Endpoints ---
+def fetch_place(query, api_key):
+    status, data = _fetch("/geo/1.0/direct", {"q": query, "limit": 1, "appid": api_key})
+    if not data:
+        return None
+    top = data[0]
+    return Place(top.get("name", query.title()), top.get("country", ""), top["lat"], top["lon"])
+
+
+def geocode(city, api_key):
+    # Memory first, then the on-disk store shared across restarts, then upstream.
+    query = normalize_location(city)
+
+    def load():
+        row = geo_store.store.get_place(query)
+        if row:
+            return Place(*row)
+        place = fetch_place(query, api_key)
+        if place:
+            geo_store.store.put_place(query, place.name, place.country, place.lat, place.lon)
+        return place
+
+    return cache.get_or_load(("geocode", query), load, TTLS["geocode"])
+
+
+def _onecall(coords, api_key, units):
+    def load():
+        global _onecall_disabled_until
+        params = {"lat": coords[0], "lon": coords[1], "units": units, "appid": api_key,
+                  "exclude": "minutely,daily,alerts"}
+        status, data = _fetch("/data/3.0/onecall", params)
+        if status in (401, 403):
+            with _onecall_lock:
+                _onecall_disabled_until = time.monotonic() + ONECALL_RETRY
+        if not data:
+            return None
+        tz_offset = data.get("timezone_offset", 0)
+        return (tz_offset, _current_from_onecall(data["current"]),
+                _hourly_from_onecall(data.get("hourly", []), tz_offset))
+
+    if time.monotonic() < _onecall_disabled_until:
+        return None
+    return cache.get_or_load(("onecall", coords, units), load, TTLS["onecall"])
+
+
+def _classic(coords, api_key, units):
+    params = {"lat": coords[0], "lon": coords[1], "units": units, "appid": api_key}
+
+    def load_weather():
+        status, data = _fetch("/data/2.5/weather", params)
+        return (data.get("timezone", 0), _current_from_weather(data)) if data else None
+
+    def load_forecast():
+        status, data = _fetch("/data/2.5/forecast", dict(params, cnt=HOURS // 3))
+        return _hourly_from_forecast(data["list"], data.get("city", {}).get("timezone", 0)) if data else None
+
+    weather = cache.get_or_load(("weather", coords, units), load_weather, TTLS["weather"])
+    if weather is None:
+        return None
+    hourly = cache.get_or_load(("forecast", coords, units), load_forecast, TTLS["forecast"])
+    if hourly is None:
+        hourly = forecast.parse_hourly([], weather[0], "forecast")
+    return weather[0], weather[1], hourly
+
+
+def weather_report(location, api_key, units="metric"):
+    # Report, or None for an unknown place; raises quota.QuotaExceeded when
+    # throttled with nothing cached or stored to answer from.
+    if isinstance(location, (tuple, list)):
+        lat, lon = normalize_location(location)
+        place = Place("", "", lat, lon)
+    else:
+        place = geocode(location, api_key)
+        if place is None:
+            return None
+
+    coords = normalize_location((place.lat, place.lon))
+    throttled = None
+    try:
+        result = _onecall(coords, api_key, units) or _classic(coords, api_key, units)
+    except quota.QuotaExceeded as e:
+        result, throttled = None, e
+    if result is None:
+        # Upstream down or out of quota, and nothing in memory: fall back to
+        # the latest stored observation for the place.
+        report = _stored_report(place, units)
+        if report is None and throttled is not None:
+            raise throttled
+        return report
+    tz_offset, current, hourly = result
+    report = Report(place, units, tz_offset, current, hourly)
+    try:
+        observations.store.record(report)
+    except sqlite3.Error:
+        pass
+    return report
+
+
+def _stored_report(place, units):
+    try:
+        stored = observations.store.latest(place.lat, place.lon)
+    except sqlite3.Error:
+        return None
+    if stored is None:
+        return None
+    row, snapshot = stored
+    # Back from model units to what OpenWeatherMap reports in metric
+    current = Current(
+        dt=row["dt"], temp=row["temp"], feels_like=row["apparent_temp"], humidity=round(row["humidity"] * 100),
+        pressure=row["pressure"], wind_speed=round(row["wind_speed"] / MS_TO_KMH, 2), wind_deg=row["wind_bearing"],
+        visibility=round(row["visibility"] * 1000), main=row["main"], description=row["description"],
+        icon=row["icon"], sunrise=row["sunrise"], sunset=row["sunset"],
+    )
+    now = time.time()
+    items = [{"dt": dt, "temp": temp, "humidity": humidity * 100, "pop": pop}
+             for dt, temp, humidity, pop in snapshot if dt >= now - 3600][:HOURS]
+    hourly = forecast.parse_hourly(items, row["tz_offset"], "onecall")
+    report = Report(place if place.name else replace(place, name=row["name"]), "metric", row["tz_offset"],
+                    current, hourly, stale=True)
+    return to_units(report, units)
+
+
+def _fahrenheit(celsius):
+    return round(celsius * 9 / 5 + 32, 2)
+
+
+def _celsius(fahrenheit):
+    return round((fahrenheit - 32) * 5 / 9, 2)
+
+
+def to_units(report, units):
+    # Converts a report locally, so a unit toggle never costs an API call.
+    if report.units == units:
+        return report
+    imperial = units == "imperial"
+    temp = _fahrenheit if imperial else _celsius
+    wind = report.current.wind_speed * MPH_PER_MS if imperial else report.current.wind_speed / MPH_PER_MS
+    current = replace(report.current, temp=temp(report.current.temp), feels_like=temp(report.current.feels_like),
+                      wind_speed=round(wind, 2))
+    hourly = report.hourly.assign(temp=temp(report.hourly["temp"])) if len(report.hourly) else report.hourly
+    return replace(report, units=units, current=current, hourly=hourly)
+
+
+def cached_report(location, api_key):
+    # Report already in the in-memory cache, in whichever units it was
+    # fetched, or None. Never calls upstream.
+    if isinstance(location, (tuple, list)):
+        lat, lon = normalize_location(location)
+        place = Place("", "", lat, lon)
+    else:
+        place = cache.get(("geocode", normalize_location(location)))
+        if place is None:
+            return None
+    coords = normalize_location((place.lat, place.lon))
+    for units in ("metric", "imperial"):
+        result = cache.get(("onecall", coords, units))
+        if result is None:
+            weather = cache.get(("weather", coords, units))
+            hourly = cache.get(("forecast", coords, units))
+            result = (weather[0], weather[1], hourly) if weather and hourly is not None else None
+        if result is not None:
+            tz_offset, current, hourly = result
+            return Report(place, units, tz_offset, current, hourly)
+    return None
+
+
+def cache_stats():
+    return cache.stats()
@@ -0,0 +1,119 @@
+import threading
+from collections import OrderedDict
+
+from cloudburst import metrics
+from cloudburst.model_registry import get_model_with_info
+
+# Order matches the columns the model was trained on in CloudBurst.ipynb.
+FEATURES = [
+    "Temperature (C)",
+    "Apparent Temperature (C)",
+    "Humidity",
+    "Wind Speed (km/h)",
+    "Wind Bearing (degrees)",
+    "Visibility (km)",
+    "Pressure (millibars)",
+]
+
+QUANTIZE_DECIMALS = 4
+
+# CloudBurst.ipynb trained on weatherHistory.csv units: °C, humidity as a
+# 0-1 fraction, wind in km/h and visibility in km. OpenWeatherMap reports
+# humidity in %, visibility in metres and wind in m/s (mph for imperial).
+MS_TO_KMH = 3.6
+MPH_TO_KMH = 1.609344
+
+
+class PredictionCache:
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+cache = PredictionCache()
+
+
+def quantize(features):
+    return tuple(round(float(v), QUANTIZE_DECIMALS) for v in features)
+
+
+def cache_key(model, features):
+    # What the model actually sees: a BernoulliNB (or its NumPy scorer) only
+    # looks at x > binarize, so the bit vector is an exact key with at most
+    # 2**7 values. Other models fall back to the inputs rounded to
+    # QUANTIZE_DECIMALS.
+    binarize = getattr(model, "binarize", None)
+    if binarize is not None:
+        return tuple(float(v) > binarize for v in features)
+    return quantize(features)
+
+
+def predict_one(features):
+    model, info = get_model_with_info()
+    # The model version is part of the key so a hot-swapped model never
+    # answers from the previous model's results.
+    key = (info["version"],) + cache_key(model, features)
+    result = cache.get(key)
+    if result is None:
+        with metrics.timed("model.predict"):
+            result = int(model.predict([[float(v) for v in features]])[0])
+        cache.put(key, result)
+    return result
+
+
+def features_from_current(current, units="metric"):
+    # Maps an owm.Current observation onto the model's feature vector.
+    if units == "imperial":
+        temp = (current.temp - 32) * 5 / 9
+        feels_like = (current.feels_like - 32) * 5 / 9
+        wind_kmh = current.wind_speed * MPH_TO_KMH
+    else:
+        temp, feels_like = current.temp, current.feels_like
+        wind_kmh = current.wind_speed * MS_TO_KMH
+    return [
+        temp,
+        feels_like,
+        current.humidity / 100,
+        wind_kmh,
+        current.wind_deg,
+        current.visibility / 1000,
+        current.pressure,
+    ]
+
+
+def cache_stats():
+    return cache.stats()
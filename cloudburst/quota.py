@@ -0,0 +1,166 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from cloudburst.config import cache_path, secret
+
+# Throttling for the shared upstream API keys. Each upstream gets a token
+# bucket (per-minute rate with a burst of one minute's worth, per process)
+# and a daily budget that resets at 00:00 UTC. The daily count lives in a
+# small SQLite file, so it survives restarts and is shared by every process
+# on the host (Streamlit, API workers, CLIs) spending the same key. When
+# either is exhausted, acquire() raises QuotaExceeded instead of calling
+# upstream, and callers fall back to cached or stale data, or report that
+# they are rate limited.
+#
+# Every HTTP attempt is charged, retries included (see http_client on_retry).
+#
+# Limits can be overridden in .streamlit/secrets.toml under [quota]
+# (e.g. weather_per_minute = 60) or via QUOTA_WEATHER_PER_MINUTE etc.
+
+DB_PATH = os.environ.get("QUOTA_PATH") or cache_path("quota.sqlite3")
+
+DEFAULTS = {
+    # OpenWeatherMap free plans allow 60 calls/min. The watchlist alone scans
+    # 26 places 96 times a day at 1 (One Call) or 2 (weather + forecast) calls
+    # each, up to ~5,000 calls/day; the rest is for visitors and map tiles.
+    # One Call 3.0 is billed per call beyond 1,000/day, so lower this (or the
+    # watchlist's refresh_minutes) to cap spend.
+    "weather": {"per_minute": 60, "per_day": 8000},
+    # Map overlay tiles, kept apart so panning a map (~60 tiles a view, most
+    # then served from the proxy's disk cache) can't starve weather lookups.
+    "tiles": {"per_minute": 120, "per_day": 6000},
+    # NewsAPI developer plan: 100 requests/day.
+    "news": {"per_minute": 10, "per_day": 100},
+}
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+def _today():
+    return datetime.now(timezone.utc).date()
+
+
+class DailyUsage:
+    # Calls per (upstream, UTC day). take() is one conditional UPDATE, so
+    # processes sharing the file never overspend a day's budget between them.
+    def __init__(self, path=DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS usage (name TEXT NOT NULL, day TEXT NOT NULL, "
+                           "used INTEGER NOT NULL, PRIMARY KEY (name, day)) WITHOUT ROWID")
+
+    def take(self, name, day, limit):
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO usage VALUES (?, ?, 0)", (name, str(day)))
+            cur = self._conn.execute("UPDATE usage SET used = used + 1 WHERE name = ? AND day = ? AND used < ?",
+                                     (name, str(day), limit))
+            return cur.rowcount == 1
+
+    def used(self, name, day):
+        with self._lock:
+            row = self._conn.execute("SELECT used FROM usage WHERE name = ? AND day = ?", (name, str(day))).fetchone()
+        return row[0] if row else 0
+
+
+class Budget:
+    def __init__(self, name, per_minute, per_day, usage=None):
+        self.name = name
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.usage = usage  # DailyUsage, or None to count in memory only
+        self._tokens = float(per_minute)
+        self._refilled = time.monotonic()
+        self._day = _today()
+        self._used_today = 0
+        self.allowed = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.per_minute, self._tokens + (now - self._refilled) * self.per_minute / 60)
+        self._refilled = now
+        if _today() != self._day:
+            self._day = _today()
+            self._used_today = 0
+
+    def _take_daily(self):
+        if self.usage is not None:
+            try:
+                return self.usage.take(self.name, self._day, self.per_day)
+            except sqlite3.Error:
+                pass  # unwritable store: count in memory for this process
+        if self._used_today >= self.per_day:
+            return False
+        self._used_today += 1
+        return True
+
+    def used_today(self):
+        if self.usage is not None:
+            try:
+                return self.usage.used(self.name, self._day)
+            except sqlite3.Error:
+                pass
+        return self._used_today
+
+    def try_acquire(self):
+        with self._lock:
+            self._refill()
+            if self._tokens < 1 or not self._take_daily():
+                self.throttled += 1
+                return False
+            self._tokens -= 1
+            self.allowed += 1
+            return True
+
+    def acquire(self):
+        if not self.try_acquire():
+            raise QuotaExceeded(f"{self.name} API quota exhausted")
+
+    def stats(self):
+        with self._lock:
+            self._refill()
+            used = self.used_today()
+            return {
+                "per_minute": self.per_minute,
+                "per_day": self.per_day,
+                "tokens": round(self._tokens, 2),
+                "used_today": used,
+                "remaining_today": max(self.per_day - used, 0),
+                "allowed": self.allowed,
+                "throttled": self.throttled,
+            }
+
+
+def _limit(name, field):
+    return int(secret("quota", f"{name}_{field}", DEFAULTS[name][field]))
+
+
+def _usage():
+    try:
+        return DailyUsage()
+    except sqlite3.Error:
+        return None
+
+
+usage = _usage()
+budgets = {name: Budget(name, _limit(name, "per_minute"), _limit(name, "per_day"), usage) for name in DEFAULTS}
+
+
+def acquire(name):
+    budgets[name].acquire()
+
+
+def try_acquire(name):
+    return budgets[name].try_acquire()
+
+
+def stats():
+    return {name: budget.stats() for name, budget in budgets.items()}
@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+# BernoulliNB prediction is a binarize step plus one matrix product, so the
+# fitted parameters are exported to a small .npz and scored with NumPy only.
+# Serving only imports scikit-learn when the pickle changed; the pickle stays
+# the source of truth, the registry re-exports the .npz when its sha256 no
+# longer matches, and `python -m cloudburst.scorer export` does it by hand.
+
+from cloudburst.model_registry import PARAMS_PATH, PICKLE_PATH, _file_sha256
+
+
+class NBScorer:
+    def __init__(self, feature_log_prob, class_log_prior, classes, binarize=0.0, feature_names=None):
+        self.feature_log_prob_ = np.asarray(feature_log_prob, dtype=np.float64)
+        self.class_log_prior_ = np.asarray(class_log_prior, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.binarize = binarize
+        self.feature_names_in_ = None if feature_names is None else np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = self.feature_log_prob_.shape[1]
+
+        # Same terms, in the same order, as BernoulliNB._joint_log_likelihood
+        # so results match sklearn bit for bit.
+        neg_prob = np.log(1 - np.exp(self.feature_log_prob_))
+        self._weights = (self.feature_log_prob_ - neg_prob).T
+        self._bias = self.class_log_prior_ + neg_prob.sum(axis=1)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        return cls(
+            model.feature_log_prob_,
+            model.class_log_prior_,
+            model.classes_,
+            binarize=model.binarize,
+            feature_names=getattr(model, "feature_names_in_", None),
+        )
+
+    @classmethod
+    def load(cls, path=PARAMS_PATH):
+        with np.load(path, allow_pickle=False) as params:
+            names = params["feature_names"]
+            return cls(
+                params["feature_log_prob"],
+                params["class_log_prior"],
+                params["classes"],
+                binarize=None if np.isnan(params["binarize"]) else float(params["binarize"]),
+                feature_names=names.tolist() if names.size else None,
+            )
+
+    def save(self, path=PARAMS_PATH, **metadata):
+        names = [] if self.feature_names_in_ is None else [str(n) for n in self.feature_names_in_]
+        np.savez_compressed(
+            path,
+            feature_log_prob=self.feature_log_prob_,
+            class_log_prior=self.class_log_prior_,
+            classes=self.classes_,
+            binarize=np.float64(np.nan if self.binarize is None else self.binarize),
+            feature_names=np.asarray(names, dtype=str),
+            metadata=np.asarray(json.dumps(metadata)),
+        )
+
+    def _check_X(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects {self.n_features_in_}")
+        if self.binarize is not None:
+            X = (X > self.binarize).astype(np.float64)
+        return X
+
+    def joint_log_likelihood(self, X):
+        return self._check_X(X) @ self._weights + self._bias
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.joint_log_likelihood(X), axis=1)]
+
+    def predict_log_proba(self, X):
+        jll = self.joint_log_likelihood(X)
+        top = jll.max(axis=1, keepdims=True)
+        return jll - (top + np.log(np.exp(jll - top).sum(axis=1, keepdims=True)))
+
+    def predict_proba(self, X):
+        return np.exp(self.predict_log_proba(X))
+
+
+def source_sha256(path=PARAMS_PATH):
+    # sha256 of the pickle a .npz was exported from, or None
+    try:
+        with np.load(path, allow_pickle=False) as params:
+            return json.loads(params["metadata"].item()).get("source_sha256")
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def load_scorer(path=PARAMS_PATH):
+    return NBScorer.load(path)
+
+
+def _load_sklearn(path):
+    import pickle
+
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def export(model_path=PICKLE_PATH, out_path=PARAMS_PATH):
+    scorer = NBScorer.from_sklearn(_load_sklearn(model_path))
+    scorer.save(out_path, source=os.path.basename(model_path), source_sha256=_file_sha256(model_path))
+    return scorer
+
+
+def check_parity(model_path=PICKLE_PATH, params_path=PARAMS_PATH, rows=100_000, seed=42):
+    model = _load_sklearn(model_path)
+    scorer = NBScorer.load(params_path)
+
+    # Values around the binarize threshold plus the example row from the notebook.
+    rng = np.random.default_rng(seed)
+    X = rng.normal(0, 50, size=(rows, scorer.n_features_in_))
+    X[rng.random(X.shape) < 0.2] = 0.0
+    X[0] = [-2.866667, -7.027778, 0.93, 11.1251, 180, 1.1109, 1034.23]
+
+    ours = scorer.predict(X)
+    theirs = model.predict(X)
+    mismatches = int((ours != theirs).sum())
+    proba_diff = float(np.abs(scorer.predict_proba(X) - model.predict_proba(X)).max())
+    return {"rows": rows, "mismatches": mismatches, "max_proba_diff": proba_diff}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cloudburst.scorer",
+                                     description="Export the BernoulliNB model for NumPy-only scoring.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="write the .npz parameters from the pickled model")
+    p_export.add_argument("--model", default=PICKLE_PATH)
+    p_export.add_argument("--out", default=PARAMS_PATH)
+
+    p_check = sub.add_parser("check", help="compare the NumPy scorer against the pickled model")
+    p_check.add_argument("--model", default=PICKLE_PATH)
+    p_check.add_argument("--params", default=PARAMS_PATH)
+    p_check.add_argument("--rows", type=int, default=100_000)
+
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        export(args.model, args.out)
+        print(f"Wrote {args.out} ({os.path.getsize(args.out)} bytes)")
+        return 0
+
+    result = check_parity(args.model, args.params, rows=args.rows)
+    print(json.dumps(result))
+    return 1 if result["mismatches"] or result["max_proba_diff"] > 1e-9 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+
+from cloudburst.config import ROOT
+
+# Shared page chrome: header, footer and background styling for every page.
+#
+# Streamlit drops any element a rerun doesn't re-emit, so the CSS can't be
+# skipped on reruns; instead each page emits one pre-built, minified style
+# block instead of three or four large ones. Background images come from
+# the local images/ folder, resized and recompressed into static/ (served by
+# Streamlit's static file serving, see .streamlit/config.toml) instead of
+# being fetched from postimg.cc/unsplash. URLs carry ?v=<content hash>, for
+# which the static handler sends a ten-year cache lifetime, so browsers
+# download each variant once.
+#
+# Rebuild the variants after changing images/:  python -m cloudburst.theme build
+
+IMAGES_DIR = os.path.join(ROOT, "images")
+STATIC_DIR = os.path.join(ROOT, "static")
+MANIFEST_PATH = os.path.join(STATIC_DIR, "manifest.json")
+STATIC_URL = "app/static"
+
+BACKGROUNDS = {
+    "cloudburst": "bg for cb.jpg",
+    "about": "8562848_25501.jpg",
+}
+WIDTHS = (1280, 1920)
+JPEG_QUALITY = 78
+WEBP_QUALITY = 72
+
+FONT = "Helvetica Neue,Arial,sans-serif"
+
+BASE_CSS = f"""
+.app-header{{background:linear-gradient(to right,#2193b0,#6dd5ed);padding:1rem;border-radius:12px;
+text-align:center;color:white;margin-bottom:20px;font-family:{FONT}}}
+.app-header h1{{margin:0;font-size:2rem}}
+.app-header p{{margin:0;font-size:1rem;opacity:.9}}
+.footer{{margin-top:30px;padding:1rem;text-align:center;color:white;
+background:linear-gradient(to right,#4b79a1,#283e51);border-radius:12px;font-size:.9rem}}
+.footer a{{color:#aadfff;text-decoration:none}}
+"""
+
+FOOTER_HTML = """<div class="footer">
+© 2025 <b>Weather App</b> | Built by <a href="https://github.com/bhavish791" target="_blank">-3P.b-</a>
+</div>"""
+
+
+def _minify(css):
+    return "".join(line.strip() for line in css.strip().splitlines())
+
+
+@lru_cache(maxsize=None)
+def _manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def asset_url(filename):
+    version = _manifest().get(filename)
+    return f"{STATIC_URL}/{filename}" + (f"?v={version}" if version else "")
+
+
+def _variant(name, width, ext):
+    return f"{name}-{width}.{ext}"
+
+
+@lru_cache(maxsize=None)
+def background_css(name):
+    small, large = WIDTHS[0], WIDTHS[-1]
+
+    def image_set(width):
+        return (f'image-set(url("{asset_url(_variant(name, width, "webp"))}") type("image/webp"),'
+                f'url("{asset_url(_variant(name, width, "jpg"))}") type("image/jpeg"))')
+
+    return _minify(f"""
+[data-testid="stAppViewContainer"]{{background-image:url("{asset_url(_variant(name, large, "jpg"))}");
+background-image:{image_set(large)};background-size:cover;background-position:center;background-attachment:fixed}}
+@media (max-width:{small}px){{[data-testid="stAppViewContainer"]{{background-image:url("{asset_url(_variant(name, small, "jpg"))}");
+background-image:{image_set(small)}}}}}
+[data-testid="stHeader"]{{background:rgba(0,0,0,0)}}
+""")
+
+
+@lru_cache(maxsize=None)
+def page_css(background=None, extra=""):
+    css = _minify(BASE_CSS)
+    if background:
+        css += background_css(background)
+    return f"<style>{css}{_minify(extra)}</style>"
+
+
+def apply(st, background=None, extra=""):
+    st.markdown(page_css(background, extra), unsafe_allow_html=True)
+
+
+def header(st, title):
+    st.markdown(f'<div class="app-header"><h1>{title}</h1></div>', unsafe_allow_html=True)
+
+
+def footer(st):
+    st.markdown(FOOTER_HTML, unsafe_allow_html=True)
+
+
+def build_assets():
+    from PIL import Image
+
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    manifest = {}
+    for name, source in BACKGROUNDS.items():
+        with Image.open(os.path.join(IMAGES_DIR, source)) as im:
+            im = im.convert("RGB")
+            for width in WIDTHS:
+                height = round(im.height * width / im.width)
+                resized = im.resize((width, height), Image.LANCZOS)
+                for ext, options in (("jpg", {"quality": JPEG_QUALITY, "optimize": True, "progressive": True}),
+                                     ("webp", {"quality": WEBP_QUALITY, "method": 6})):
+                    filename = _variant(name, width, ext)
+                    path = os.path.join(STATIC_DIR, filename)
+                    resized.save(path, **options)
+                    with open(path, "rb") as f:
+                        manifest[filename] = hashlib.sha1(f.read()).hexdigest()[:10]
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    _manifest.cache_clear()
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cloudburst.theme",
+                                     description="Build resized, compressed background variants into static/.")
+    parser.add_argument("command", choices=["build"])
+    parser.parse_args(argv)
+    for filename in build_assets():
+        print(f"{filename}  {os.path.getsize(os.path.join(STATIC_DIR, filename)) // 1024} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
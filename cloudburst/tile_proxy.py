@@ -0,0 +1,153 @@
+import argparse
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cloudburst import http_client, quota
+from cloudburst.config import cache_path, secret
+from cloudburst.weather_map import OVERLAY_TYPES
+
+# Serves OpenWeatherMap overlay tiles from a local disk cache so browsers
+# never see the API key and each (layer, z, x, y) is fetched upstream at most
+# once per TILE_TTL, however many visitors pan over it. Concurrent misses for
+# the same tile share one upstream request.
+#
+#   python -m cloudburst.tile_proxy --port 8502
+#
+# then set [tiles] proxy_url = "http://<host>:8502" in .streamlit/secrets.toml.
+
+UPSTREAM = "https://tile.openweathermap.org/map/{layer}/{z}/{x}/{y}.png"
+TILE_TTL = int(os.environ.get("TILE_TTL", 10 * 60))
+LAYERS = frozenset(OVERLAY_TYPES.values())
+PATH_RE = re.compile(r"^/tiles/([a-z_]+)/(\d{1,2})/(\d+)/(\d+)\.png$")
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _tile_file(layer, z, x, y):
+    return cache_path("tiles", layer, str(z), str(x), f"{y}.png")
+
+
+def _read_cached(path):
+    try:
+        age = time.time() - os.path.getmtime(path)
+        if age > TILE_TTL:
+            return None, 0
+        with open(path, "rb") as f:
+            return f.read(), TILE_TTL - age
+    except FileNotFoundError:
+        return None, 0
+
+
+def _fetch(layer, z, x, y, api_key):
+    # Own budget, so map panning can't use up the weather lookups'; retries count too
+    quota.acquire("tiles")
+    res = http_client.get(UPSTREAM.format(layer=layer, z=z, x=x, y=y), params={"appid": api_key},
+                          on_retry=lambda: quota.try_acquire("tiles"))
+    if res.status_code != 200:
+        return None
+    return res.content
+
+
+def get_tile(layer, z, x, y, api_key):
+    # Returns (png bytes or None, seconds of freshness left).
+    path = _tile_file(layer, z, x, y)
+    data, ttl = _read_cached(path)
+    if data is not None:
+        return data, ttl
+
+    key = (layer, z, x, y)
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = {"done": threading.Event(), "data": None}
+    if not leader:
+        flight["done"].wait()
+        return flight["data"], TILE_TTL
+
+    try:
+        data = _fetch(layer, z, x, y, api_key)
+        if data is not None:
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        flight["data"] = data
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        flight["done"].set()
+    return data, TILE_TTL
+
+
+class TileHandler(BaseHTTPRequestHandler):
+    api_key = None
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        match = PATH_RE.match(self.path.split("?", 1)[0])
+        if not match or match.group(1) not in LAYERS:
+            return self._send(404, b"not found", "text/plain")
+        layer, z, x, y = match.group(1), *map(int, match.groups()[1:])
+        if z > 20 or x >= 2 ** z or y >= 2 ** z:
+            return self._send(404, b"not found", "text/plain")
+
+        try:
+            data, ttl = get_tile(layer, z, x, y, self.api_key)
+        except quota.QuotaExceeded:
+            return self._send(429, b"rate limited", "text/plain", {"Retry-After": "60"})
+        except Exception:
+            data, ttl = None, 0
+        if data is None:
+            return self._send(502, b"upstream error", "text/plain")
+
+        etag = '"%s"' % hashlib.sha1(data).hexdigest()
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={int(ttl)}"}
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, b"", None, headers)
+        return self._send(200, data, "image/png", headers)
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host, port, api_key):
+    handler = type("Handler", (TileHandler,), {"api_key": api_key})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cloudburst.tile_proxy",
+                                     description="Caching proxy for OpenWeatherMap map tiles.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, secret("weather", "api_key"))
+    print(f"Serving tiles on http://{args.host}:{args.port}/tiles/<layer>/<z>/<x>/<y>.png")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
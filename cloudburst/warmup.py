@@ -0,0 +1,155 @@
+import argparse
+import ast
+import importlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from cloudburst.config import ROOT, secret
+
+# Process warm-up. Pages import their heavy dependencies (pandas, folium,
+# streamlit_folium) lazily, only where they are used; start() then loads
+# them, the model and the shared caches in a background thread, so the first
+# visitor doesn't pay for them. Every page calls start(); only the first
+# call in a process does anything.
+#
+# `python -m cloudburst.warmup` runs the same steps in the foreground and
+# reports timings; `--budget` measures cold import time per page in fresh
+# interpreters and fails when a page goes over its budget.
+
+PRELOAD = ["numpy", "pandas", "plotly.graph_objects", "folium", "streamlit_folium"]
+PRIME_TOP_CITIES = 50
+
+# Page scripts and the cold import budget, in milliseconds, for the modules
+# each one imports at script start (on top of streamlit itself). The module
+# lists are read from the scripts themselves, see page_imports().
+PAGES = {
+    "home": "streamlit_app.py",
+    "cloudburst": os.path.join("pages", "0_🌩️ Cloudburst Prediction.py"),
+    "weather": os.path.join("pages", "1_🌦️ Weather.py"),
+    "about": os.path.join("pages", "2_📘 About.py"),
+}
+IMPORT_BUDGET_MS = {"home": 200, "cloudburst": 50, "weather": 200, "about": 50}
+
+_started = threading.Event()
+timings = {}
+
+
+def _timed(name, fn):
+    start = time.perf_counter()
+    try:
+        fn()
+    except Exception as e:
+        timings[name] = f"failed: {e}"
+        return
+    timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def _load_model():
+    from cloudburst.model_registry import get_model
+
+    get_model()
+
+
+def _prime_geocodes():
+    # Copy the most requested places from the on-disk store into the
+    # in-memory cache; no upstream calls.
+    from cloudburst import geo_store, owm
+
+    for query in geo_store.store.top_queries(PRIME_TOP_CITIES):
+        row = geo_store.store.get_place(query)
+        if row:
+            owm.cache.set(("geocode", query), owm.Place(*row), owm.TTLS["geocode"])
+
+
+def _start_news():
+    from cloudburst import news_feed
+
+    api_key = secret("news", "api_key")
+    if api_key:
+        news_feed.get_feed(api_key)
+
+
+def run():
+    _timed("model", _load_model)
+    _timed("news_feed", _start_news)
+    _timed("geocodes", _prime_geocodes)
+    for module in PRELOAD:
+        _timed(f"import {module}", lambda: importlib.import_module(module))
+    return dict(timings)
+
+
+def start():
+    if _started.is_set():
+        return
+    _started.set()
+    from cloudburst import metrics
+
+    metrics.start_server()
+    threading.Thread(target=run, name="warmup", daemon=True).start()
+
+
+def page_imports(path):
+    # Modules a page script imports at module level, i.e. on every run;
+    # imports inside functions or branches are lazy and not counted.
+    with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            for alias in node.names:
+                # `from package import module` loads the submodule too
+                name = f"{node.module}.{alias.name}"
+                modules.append(name if _is_module(name) else node.module)
+    return list(dict.fromkeys(modules))
+
+
+def _is_module(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def measure_imports(modules):
+    code = (
+        "import sys, time; import streamlit; t = time.perf_counter()\n"
+        f"for m in {modules!r}: __import__(m)\n"
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def check_budget():
+    report = {}
+    for page, path in PAGES.items():
+        ms = measure_imports(page_imports(path))
+        report[page] = {"import_ms": round(ms, 1), "budget_ms": IMPORT_BUDGET_MS[page],
+                        "ok": ms <= IMPORT_BUDGET_MS[page]}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cloudburst.warmup",
+                                     description="Warm up the app's process-wide state, or check the import budget.")
+    parser.add_argument("--budget", action="store_true", help="measure cold import time per page against its budget")
+    args = parser.parse_args(argv)
+
+    if args.budget:
+        report = check_budget()
+        print(json.dumps(report, indent=2))
+        return 0 if all(r["ok"] for r in report.values()) else 1
+
+    print(json.dumps(run(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
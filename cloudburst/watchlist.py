@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from cloudburst import owm, quota
+from cloudburst.config import ROOT
+from cloudburst.model_registry import get_model
+from cloudburst.predict import features_from_current
+
+# Background cloudburst-risk scan over a configured list of cities
+# (watchlist.toml). One thread per process refreshes the whole list on a
+# schedule: reports are fetched concurrently under a cap on upstream HTTP
+# calls per second (geocoding included), turned into feature vectors and
+# scored in a single vectorized call. Page views only read the latest
+# snapshot and never call upstream themselves. A scan that fails outright
+# keeps the previous rows and records the error instead.
+
+CONFIG_PATH = os.environ.get("WATCHLIST_PATH", os.path.join(ROOT, "watchlist.toml"))
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    rows: tuple = ()
+    refreshed_at: float = 0.0
+    seconds: float = 0.0
+    failed: tuple = ()
+    error: str = ""  # why the last scan produced nothing; rows are from the one before
+    failed_at: float = 0.0
+
+
+def load_config(path=CONFIG_PATH):
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+    locations = [(name, name) for name in config.get("cities", [])]
+    locations += [(c["name"], (c["lat"], c["lon"])) for c in config.get("coords", [])]
+    return {
+        "locations": locations,
+        "refresh": config.get("refresh_minutes", 15) * 60,
+        "max_concurrency": config.get("max_concurrency", 4),
+        "requests_per_second": config.get("requests_per_second", 5),
+    }
+
+
+class _RateLimit:
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        time.sleep(max(slot - now, 0))
+
+
+def scan(locations, api_key, max_concurrency=4, requests_per_second=5):
+    limit = _RateLimit(requests_per_second)
+
+    def fetch(location):
+        with owm.paced(limit.wait):
+            try:
+                return owm.weather_report(location, api_key)
+            except quota.QuotaExceeded:
+                return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="watchlist") as pool:
+        reports = list(pool.map(fetch, [location for _, location in locations]))
+
+    found = [(name, r) for (name, _), r in zip(locations, reports) if r is not None]
+    failed = tuple(name for (name, _), r in zip(locations, reports) if r is None)
+    rows = ()
+    if found:
+        model = get_model()
+        X = np.array([features_from_current(r.current, r.units) for _, r in found])
+        risk = model.predict_proba(X)[:, int(np.flatnonzero(np.asarray(model.classes_) == 1)[0])]
+        predicted = model.predict(X)
+        rows = tuple(sorted(
+            (
+                {
+                    "City": name,
+                    "Risk": float(p),
+                    "Cloudburst": bool(c == 1),
+                    "Condition": r.current.description.title(),
+                    "Temperature (°C)": x[0],
+                    "Humidity (%)": r.current.humidity,
+                    "Wind (km/h)": round(x[3], 1),
+                    "lat": r.place.lat,
+                    "lon": r.place.lon,
+                }
+                for (name, r), x, p, c in zip(found, X, risk, predicted)
+            ),
+            key=lambda row: row["Risk"],
+            reverse=True,
+        ))
+    return Snapshot(rows, time.time(), time.perf_counter() - start, failed)
+
+
+class Watchlist:
+    def __init__(self, api_key, config):
+        self.api_key = api_key
+        self.config = config
+        self._snapshot = Snapshot()
+        self._first_scan = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="watchlist", daemon=True)
+                self._thread.start()
+        return self
+
+    def snapshot(self, wait=0):
+        if wait and not self._first_scan.is_set():
+            self._first_scan.wait(wait)
+        return self._snapshot
+
+    def _run(self):
+        while True:
+            old = self._snapshot
+            try:
+                snapshot = scan(self.config["locations"], self.api_key,
+                                self.config["max_concurrency"], self.config["requests_per_second"])
+                if snapshot.rows or not snapshot.failed:
+                    self._snapshot = snapshot
+                else:
+                    self._snapshot = replace(old, failed=snapshot.failed, failed_at=time.time(),
+                                             error=f"no report for any of {len(snapshot.failed)} locations")
+            except Exception as e:
+                # Retried on the next cycle
+                self._snapshot = replace(old, failed_at=time.time(), error=str(e) or type(e).__name__)
+            self._first_scan.set()
+            time.sleep(self.config["refresh"])
+
+
+_watchlist = None
+_watchlist_lock = threading.Lock()
+
+
+def get_watchlist(api_key):
+    global _watchlist
+    with _watchlist_lock:
+        if _watchlist is None:
+            _watchlist = Watchlist(api_key, load_config()).start()
+        return _watchlist
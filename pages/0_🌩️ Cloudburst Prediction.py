@@ -1,63 +1,29 @@
+import os
+
 import streamlit as st
-import pickle
+from cloudburst.model_registry import get_model_with_info
+from cloudburst.predict import FEATURES, features_from_current, predict_one, cache_stats
+from cloudburst import metrics, theme, warmup
 
 #def prediction_page():
 
 st.set_page_config(page_title="Cloudburst Prediction", page_icon="🌩️", layout="wide")
+warmup.start()
+metrics.page_run(st, "cloudburst")
+
+# Styled Header + page styling (background served locally from static/)
+theme.apply(st, background="cloudburst", extra="""
+    [data-testid="stAppViewContainer"] { font-family: Helvetica Neue,Arial, sans-serif; }
+    h1 { color: white; }
+    h2, h3 { color: #FFD700; }
+""")
+theme.header(st, "🌩️ Cloudburst prediction")
 
-# Styled Header
-st.markdown("""
-    <style>
-        .app-header {
-            background: linear-gradient(to right, #2193b0, #6dd5ed);
-            padding: 1rem;
-            border-radius: 12px;
-            text-align: center;
-            color: white;
-            margin-bottom: 20px;
-        }
-        .app-header h1 {
-            margin: 0;
-            font-size: 2rem;
-            font-family: Helvetica Neue,Arial, sans-serif;
-        }
-        .app-header p {
-            margin: 0;
-            font-size: 1rem;
-            opacity: 0.9;
-            font-family: Helvetica Neue,Arial, sans-serif;
-        }
-    </style>
-    <div class="app-header">
-        <h1>🌩️ Cloudburst prediction</h1>
-        
-    </div>
-""", unsafe_allow_html=True)
-
-# Page styling
-page = """
-<style>
-[data-testid="stAppViewContainer"] {
-    background-image: url("https://i.postimg.cc/nct12YSX/bg-for-cb.jpg");
-    background-size: cover;
-    font-family: Helvetica Neue,Arial, sans-serif;
-}
-[data-testid="stHeader"] {
-    background-color: rgba(0,0,0,0);
-}
-h1 {
-    color: white;
-    
-}
-h2, h3 {
-    color: #FFD700;
-}
-</style>
-"""
-st.markdown(page, unsafe_allow_html=True)
-
-# Load the pre-trained model
-model = pickle.load(open("cbmodel.pkl", "rb"))
+# Load the pre-trained model (shared across reruns, reloaded only when the file changes)
+_, info = get_model_with_info()
+st.caption(f"Model version {info['version']} · loaded {info['loaded_at']} in {info['load_seconds'] * 1000:.1f} ms")
+
+API_KEY = st.secrets["weather"]["api_key"]
 
 
 
@@ -87,12 +53,8 @@ input_vis = st.number_input("Visibility (km)", format="%.4f")
 st.markdown("_Example: Pressure (1013 hPa)_")
 input_pre = st.number_input("Pressure (hPa)")
 
-# Prepare input for prediction
-pred = [[input_tem, input_atem, input_hum, input_ws, input_wb, input_vis, input_pre]]
-result = model.predict(pred)
-
-# Prediction logic
-if st.button("Predict"):
+# --- Result display (manual and live predictions) ---
+def show_result(result):
     if result == 1:
         st.subheader("⚠️ **Alert: Cloudburst Predicted!**")
         st.markdown(
@@ -128,24 +90,81 @@ if st.button("Predict"):
             unsafe_allow_html=True
         )
 
-        # Styled Footer
-st.markdown("""
-    <style>
-        .footer {
-            margin-top: 30px;
-            padding: 1rem;
-            text-align: center;
-            color: white;
-            background: linear-gradient(to right, #4b79a1, #283e51);
-            border-radius: 12px;
-            font-size: 0.9rem;
-        }
-        .footer a {
-            color: #aadfff;
-            text-decoration: none;
-        }
-    </style>
-    <div class="footer">
-        © 2025 <b>Weather App</b> | Built by <a href="https://github.com/bhavish791" target="_blank">-3P.b-</a> 
-    </div>
-""", unsafe_allow_html=True)
+# Prediction logic (inference only runs when Predict is pressed)
+if st.button("Predict"):
+    pred = [input_tem, input_atem, input_hum, input_ws, input_wb, input_vis, input_pre]
+    result = predict_one(pred)
+    stats = cache_stats()
+    st.caption(f"Prediction cache: {stats['hits']} hits / {stats['misses']} misses ({stats['size']} entries)")
+
+    show_result(result)
+
+# --- Live mode: score current OpenWeatherMap observations ---
+st.markdown("### Live Prediction")
+st.markdown("_Uses the current weather for a city, converted to the model's units (km/h wind, km visibility)._")
+live_city = st.text_input("📍 City", placeholder="e.g., Shimla, Dehradun", key="live_city")
+if live_city and st.button("Predict from live weather"):
+    # Imported on use: owm pulls in requests, which would more than double the page's cold import time
+    from cloudburst import owm, quota
+
+    # A report the Weather page (or another visitor) already fetched is reused as is
+    try:
+        report = owm.cached_report(live_city, API_KEY) or owm.weather_report(live_city, API_KEY)
+        throttled = False
+    except quota.QuotaExceeded:
+        report, throttled = None, True
+    if throttled:
+        st.warning("⏳ The weather service is rate limited right now; try again later.")
+    elif report is None:
+        st.error("City not found.")
+    else:
+        features = features_from_current(report.current, report.units)
+        st.caption(" · ".join(f"{name}: {value:.2f}" for name, value in zip(FEATURES, features)))
+        show_result(predict_one(features))
+
+# --- Batch mode: score a whole station log ---
+def discard_batch_result():
+    # One scored file per session on disk: the previous one goes before the next is written
+    previous = st.session_state.pop("batch_result", None)
+    if previous is not None:
+        previous.discard()
+
+
+st.markdown("### Batch Prediction")
+with st.expander("📂 Score a CSV file (weatherHistory.csv column layout)"):
+    upload = st.file_uploader("Station log", type=["csv"])
+    out_format = st.radio("Output format", ["csv", "parquet"], horizontal=True)
+    scored_now = False
+    if upload is not None and st.button("Score file"):
+        from cloudburst.batch import ScoredFile, score_file
+
+        discard_batch_result()
+        bar = st.progress(0.0, text="Scoring...")
+        result = ScoredFile(out_format, f"{os.path.splitext(upload.name)[0]}_scored.{out_format}")
+        size = max(upload.size, 1)
+
+        def progress(rows, seconds):
+            bar.progress(min(upload.tell() / size, 1.0), text=f"{rows:,} rows · {rows / max(seconds, 1e-9):,.0f} rows/s")
+
+        try:
+            result.stats = score_file(upload, result.path, fmt=out_format, progress=progress)
+            st.session_state["batch_result"] = result
+            scored_now = True
+        except (ValueError, RuntimeError) as e:
+            result.discard()
+            st.error(f"Could not score file: {e}")
+
+    if "batch_result" in st.session_state:
+        result = st.session_state["batch_result"]
+        stats = result.stats
+        st.success(f"Scored {stats['rows']:,} rows in {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/s)")
+        if not stats["rows"] or not os.path.exists(result.path):
+            st.info("No rows were scored, so there is nothing to download.")
+        # The output is read into the media store only when it is offered, not
+        # on every rerun of the page (each number input change is one)
+        elif scored_now or st.button("Prepare download"):
+            with open(result.path, "rb") as f:
+                st.download_button("⬇️ Download predictions", f, file_name=result.file_name, on_click="ignore")
+
+# Styled Footer
+theme.footer(st)
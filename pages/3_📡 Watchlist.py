@@ -0,0 +1,59 @@
+import time
+
+import streamlit as st
+from cloudburst import metrics, theme, warmup, watchlist
+
+st.set_page_config(page_title="Cloudburst Watchlist", page_icon="📡", layout="wide")
+warmup.start()
+metrics.page_run(st, "watchlist")
+
+# Styled Header
+theme.apply(st)
+theme.header(st, "📡 Cloudburst Watchlist")
+
+# Results come from the background scanner; this page never calls the weather API itself
+API_KEY = st.secrets["weather"]["api_key"]
+scanner = watchlist.get_watchlist(API_KEY)
+snapshot = scanner.snapshot(wait=30)
+
+if snapshot.error:
+    failed_ago = int((time.time() - snapshot.failed_at) // 60)
+    st.error(f"⚠️ The last scan failed {failed_ago} min ago ({snapshot.error})"
+             + ("; showing the previous results." if snapshot.rows else "; retrying on the next cycle."))
+
+if not snapshot.rows:
+    if not snapshot.error:
+        st.info("⏳ The first scan of the watchlist is still running. Check back in a moment.")
+else:
+    age = int((time.time() - snapshot.refreshed_at) // 60)
+    st.caption(f"{len(snapshot.rows)} locations · scanned {age} min ago in {snapshot.seconds:.1f}s · "
+               f"refreshes every {scanner.config['refresh'] // 60} min")
+
+    at_risk = [row for row in snapshot.rows if row["Cloudburst"]]
+    if at_risk:
+        st.warning(f"⚠️ Cloudburst predicted for: {', '.join(row['City'] for row in at_risk)}")
+    else:
+        st.success("✅ No cloudburst predicted for any watched location.")
+
+    # --- Ranked risk table ---
+    st.markdown("### Risk Ranking")
+    st.dataframe(
+        [{k: v for k, v in row.items() if k not in ("lat", "lon")} for row in snapshot.rows],
+        column_config={"Risk": st.column_config.ProgressColumn("Risk", min_value=0.0, max_value=1.0, format="%.2f")},
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    # --- Map ---
+    st.markdown("### 🗺️ Watchlist Map")
+    st.map(
+        [{"lat": row["lat"], "lon": row["lon"], "size": 5000 + 45000 * row["Risk"],
+          "color": "#E74C3C" if row["Cloudburst"] else "#2ECC71"} for row in snapshot.rows],
+        latitude="lat", longitude="lon", size="size", color="color",
+    )
+
+if snapshot.failed:
+    st.caption(f"Could not fetch: {', '.join(snapshot.failed)}")
+
+# Styled Footer
+theme.footer(st)
@@ -0,0 +1,68 @@
+import hmac
+
+import streamlit as st
+from cloudburst import metrics, owm, predict, quota, theme, warmup
+
+st.set_page_config(page_title="Admin", page_icon="🛠️", layout="wide")
+warmup.start()
+
+# Styled Header
+theme.apply(st)
+theme.header(st, "🛠️ Runtime metrics")
+
+# Only shown when [admin] token is set in secrets, and to whoever knows it
+TOKEN = st.secrets.get("admin", {}).get("token")
+if not TOKEN:
+    st.info("The admin page is disabled. Set `[admin] token` in `.streamlit/secrets.toml` to enable it.")
+    st.stop()
+entered = st.text_input("Admin token", type="password")
+if not hmac.compare_digest(entered.encode(), str(TOKEN).encode()):
+    st.stop()
+
+st.button("🔄 Refresh")
+counts = metrics.counters()
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+# --- Sessions ---
+runs = {dict(labels)["page"]: n for (name, labels), n in counts.items() if name == "page_runs"}
+sessions = counts.get(("sessions", ()), 0)
+col1, col2, col3 = st.columns(3)
+col1.metric("Sessions", sessions)
+col2.metric("Script runs", sum(runs.values()))
+col3.metric("Runs per session", f"{sum(runs.values()) / sessions:.1f}" if sessions else "–")
+st.dataframe([{"Page": page, "Runs": n} for page, n in sorted(runs.items())], hide_index=True)
+
+# --- Stage latency ---
+st.markdown("### ⏱️ Stage Latency")
+st.dataframe(
+    [{"Stage": stage, "Labels": ", ".join(f"{k}={v}" for k, v in labels), "Count": s["count"],
+      "Mean (ms)": _ms(s["mean"]), "p50 (ms)": _ms(s["p50"]), "p95 (ms)": _ms(s["p95"])}
+     for (stage, labels), s in sorted(metrics.stages().items())],
+    hide_index=True,
+    use_container_width=True,
+)
+
+# --- Upstream ---
+st.markdown("### 🌐 Upstream Responses")
+st.dataframe(
+    [dict(dict(labels), calls=n) for (name, labels), n in sorted(counts.items()) if name == "upstream_responses"],
+    hide_index=True,
+)
+st.dataframe([dict(upstream=name, **stats) for name, stats in quota.stats().items()], hide_index=True)
+
+# --- Caches ---
+st.markdown("### 🗃️ Cache Hit Rates")
+rows = [dict(cache="owm", namespace=ns, **stats) for ns, stats in owm.cache_stats()["namespaces"].items()]
+rows.append(dict(cache="predict", namespace="all", **{k: v for k, v in predict.cache_stats().items()
+                                                        if k not in ("size", "maxsize")}))
+st.dataframe(rows, hide_index=True, use_container_width=True)
+
+with st.expander("Prometheus text"):
+    st.code(metrics.render(), language="text")
+
+# Styled Footer
+theme.footer(st)
@@ -1,49 +1,53 @@
+import ipaddress
+import time
+
 import streamlit as st
-import requests
-import pandas as pd
-import plotly.express as px
-from datetime import datetime, timezone
+from cloudburst import charts, fanout, forecast, geo_store, http_client, metrics, news_feed, owm, quota, theme, warmup
+from cloudburst.config import secret
 
 # Set page config FIRST
 st.set_page_config(page_title="Home", page_icon="🏠", layout="wide")
+warmup.start()
+metrics.page_run(st, "home")
 
 # Styled Header
-st.markdown("""
-    <style>
-        .app-header {
-            background: linear-gradient(to right, #2193b0, #6dd5ed);
-            padding: 1rem;
-            border-radius: 12px;
-            text-align: center;
-            color: white;
-            margin-bottom: 20px;
-        }
-        .app-header h1 {
-            margin: 0;
-            font-size: 2rem;
-        }
-    </style>
-    <div class="app-header">
-        <h1>🌦️ Weather & Cloudburst App</h1>
-    </div>
-""", unsafe_allow_html=True)
+theme.apply(st)
+theme.header(st, "🌦️ Weather & Cloudburst App")
 
 # --- Get user's city via IP ---
-def get_user_city():
+IPINFO_URL = secret("upstream", "ipinfo_url", "https://ipinfo.io")
+
+def get_client_ip():
+    # Headers are client-controlled: only a well-formed public address goes
+    # into the ipinfo URL and the lookup cache; anything else uses "self".
+    forwarded = st.context.headers.get("X-Forwarded-For", "")
+    candidate = forwarded.split(",")[0].strip() or st.context.headers.get("X-Real-Ip") or ""
+    try:
+        ip = ipaddress.ip_address(candidate)
+    except ValueError:
+        return None
+    return str(ip) if ip.is_global else None
+
+def get_user_city(ip=None):
+    key = ip or "self"
+    city = geo_store.store.get_city(key)
+    if city:
+        return city
     try:
-        response = requests.get("https://ipinfo.io")
-        return response.json().get("city", "Mumbai")
+        url = f"{IPINFO_URL}/{ip}/json" if ip else f"{IPINFO_URL}/json"
+        city = http_client.get(url, timeout=3).json().get("city")
     except:
-        return "Mumbai"
+        city = None
+    if city:
+        geo_store.store.put_city(key, city)
+    return city or "Mumbai"
         
 
 # --- Get current weather ---
 def get_weather_data(city, api_key):
-    url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-    res = requests.get(url)
-    if res.status_code == 200:
-        data = res.json()
-        condition = data["weather"][0]["main"].lower()
+    report = owm.weather_report(city, api_key)
+    if report:
+        condition = report.current.main.lower()
         color_map = {
             "clear": "#FDF6EC",
             "clouds": "#ECECEC",
@@ -53,67 +57,48 @@ def get_weather_data(city, api_key):
             "mist": "#E8E8E8",
         }
         bg_color = color_map.get(condition, "#F9F9F9")
-        return data, bg_color
+        return report, bg_color
     return None, "#FFFFFF"
 
 # --- Hourly Forecast Function ---
-def display_hourly_forecast(city, api_key, units="metric"):
-    forecast_url = f"https://api.openweathermap.org/data/2.5/forecast?q={city}&appid={api_key}&units={units}"
-    res = requests.get(forecast_url)
-
-    if res.status_code == 200:
-        forecast_data = res.json()["list"][:8]  # 8x3hr = ~24h
-        times = [datetime.fromtimestamp(item["dt"]).strftime("%I %p") for item in forecast_data]
-        temps = [item["main"]["temp"] for item in forecast_data]
-        humidity = [item["main"]["humidity"] for item in forecast_data]
-        rain_chance = [item.get("pop", 0) * 100 for item in forecast_data]
-
-        df = pd.DataFrame({
-            "Time": times,
-            "Temperature": temps,
-            "Humidity": humidity,
-            "Rain Probability": rain_chance
-        })
+def display_hourly_forecast(hourly):
+    if hourly is not None and len(hourly):
+        df = forecast.chart_frame(hourly)
 
         st.markdown("### 📊 Hourly Forecast (Next 24h)")
-        fig = px.line(df, x="Time", y=["Temperature", "Humidity", "Rain Probability"], markers=True,
-                      labels={"value": "Measurement", "Time": "Hour"},
-                      title=f"Forecast: Temp (°C), Humidity (%) & Rain Probability (%)",
-                      color_discrete_map={
-                          "Temperature": "#FF5733",
-                          "Humidity": "#33C1FF",
-                          "Rain Probability": "#2ECC71"
-                      })
-        fig.update_traces(mode="lines+markers")
-        fig.update_layout(hovermode="x unified")
-        st.plotly_chart(fig, use_container_width=True)
+        fig = charts.forecast_figure(df, "°C", title=f"Forecast: Temp (°C), Humidity (%) & Rain Probability (%)")
+        with metrics.timed("chart.render"):
+            st.plotly_chart(fig, use_container_width=True)
     else:
         st.error("Could not fetch hourly forecast.")
 
-# --- Get user location & weather ---
+# --- Fetch stage: start all upstream calls at once ---
+# The weather report (current + next 24h) waits only on the city lookup. News
+# comes from the process-wide poller, so it is a snapshot read, not a request.
+# Page latency is the slowest call, not the sum, and capped by FETCH_DEADLINE.
+# The city and weather are kept in session state, so reruns within
+# SESSION_TTL render from there instead of fetching again.
+FETCH_DEADLINE = 8
+SESSION_TTL = owm.TTLS["onecall"]
 API_KEY = st.secrets["weather"]["api_key"]
-city = get_user_city()
-weather_data, bg_color = get_weather_data(city, API_KEY)
+NEWS_API_KEY = st.secrets["news"]["api_key"]
+
+session_data = st.session_state.get("home_data")
+if session_data and time.time() - session_data["fetched_at"] < SESSION_TTL:
+    city_future = fanout.resolved(session_data["city"])
+    weather_future = fanout.resolved(session_data["weather"])
+else:
+    session_data = None
+    city_future = fanout.submit(get_user_city, get_client_ip())
+    weather_future = fanout.then(city_future, lambda city: get_weather_data(city, API_KEY))
+futures = {
+    "city": city_future,
+    "weather": weather_future,
+    "news": fanout.submit(news_feed.get_feed(NEWS_API_KEY).snapshot, FETCH_DEADLINE),
+}
 
 # --- Dynamic Background ---
-st.markdown(f"""
-    <style>
-    [data-testid="stAppViewContainer"] {{
-        background-color: {bg_color};
-    }}
-    .home-title {{
-        font-size: 36px;
-        text-align: center;
-        color: #003566;
-        padding-bottom: 0.5em;
-    }}
-    .metric-box {{
-        background-color: #ffffffaa;
-        padding: 15px;
-        border-radius: 12px;
-    }}
-    </style>
-""", unsafe_allow_html=True)
+background_slot = st.empty()
 
 # --- Intro Section ---
 st.markdown("### Features of the App")
@@ -124,25 +109,8 @@ st.markdown("""
 ╰┈➤  **Latest Global Weather News**  
 """)
 
-# --- Show Weather Info ---
-if weather_data:
-    icon = weather_data["weather"][0]["icon"]
-    desc = weather_data["weather"][0]["description"].title()
-
-    st.markdown(f"###  Weather in {city}")
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        st.metric("Temperature", f"{weather_data['main']['temp']} °C")
-        st.metric("Humidity", f"{weather_data['main']['humidity']} %")
-        st.metric("Condition", desc)
-        st.metric("Wind Speed", f"{weather_data['wind']['speed']} m/s")
-    with col2:
-        st.image(f"http://openweathermap.org/img/wn/{icon}@4x.png")
-
-    # --- Show hourly forecast instead of 7-day ---
-    display_hourly_forecast(city, API_KEY)
-else:
-    st.warning("Weather info not available.")
+# Placeholders keep the page layout fixed while sections fill in as data arrives
+weather_slot = st.empty()
 
 # --- Tips ---
 st.markdown("### 💡 Smart Weather Tips")
@@ -152,37 +120,78 @@ st.warning("🚗 Avoid waterlogged roads during heavy rains.")
 st.info("🧴 Use sunscreen even on cloudy days.")
 
 # --- News Section ---
-NEWS_API_KEY = st.secrets["news"]["api_key"]
-news_url = f"https://newsapi.org/v2/top-headlines?q=weather&language=en&pageSize=4&apiKey={NEWS_API_KEY}"
-news_response = requests.get(news_url).json()
-
 st.markdown("### 📰 Latest Weather News")
-if "articles" in news_response:
-    for article in news_response["articles"]:
-        st.markdown(f"🔹 **[{article['title']}]({article['url']})**")
-        if article.get("description"):
-            st.caption(article["description"])
-else:
-    st.warning("🛑 Could not load news at the moment.")
+news_slot = st.empty()
+with news_slot.container():
+    st.caption("Loading news…")
 
 # --- Footer ---
-st.markdown("""
-    <style>
-        .footer {
-            margin-top: 30px;
-            padding: 1rem;
-            text-align: center;
-            color: white;
-            background: linear-gradient(to right, #4b79a1, #283e51);
-            border-radius: 12px;
-            font-size: 0.9rem;
-        }
-        .footer a {
-            color: #aadfff;
-            text-decoration: none;
-        }
-    </style>
-    <div class="footer">
-        © 2025 <b>Weather App</b> | Built by <a href="https://github.com/bhavish791" target="_blank">-3P.b-</a> 
-    </div>
-""", unsafe_allow_html=True)
+theme.footer(st)
+
+# --- Render each section as soon as its data is in ---
+city = "Mumbai"
+for name, result, error in fanout.as_ready(futures, FETCH_DEADLINE):
+    if name == "city":
+        city = result or city
+
+    elif name == "weather":
+        report, bg_color = result if result else (None, "#FFFFFF")
+        if report and session_data is None:
+            st.session_state["home_data"] = {"city": city_future.result(), "weather": result,
+                                             "fetched_at": time.time()}
+        background_slot.markdown(f"""
+            <style>
+            [data-testid="stAppViewContainer"] {{
+                background-color: {bg_color};
+            }}
+            .home-title {{
+                font-size: 36px;
+                text-align: center;
+                color: #003566;
+                padding-bottom: 0.5em;
+            }}
+            .metric-box {{
+                background-color: #ffffffaa;
+                padding: 15px;
+                border-radius: 12px;
+            }}
+            </style>
+        """, unsafe_allow_html=True)
+
+        # --- Show Weather Info ---
+        with weather_slot.container():
+            if report:
+                current = report.current
+                icon = current.icon
+                desc = current.description.title()
+
+                st.markdown(f"###  Weather in {report.place.name or city}")
+                if report.stale:
+                    st.caption("⚠️ Weather service unavailable; showing the last stored observation.")
+                col1, col2 = st.columns([2, 1])
+                with col1:
+                    st.metric("Temperature", f"{current.temp} °C")
+                    st.metric("Humidity", f"{current.humidity} %")
+                    st.metric("Condition", desc)
+                    st.metric("Wind Speed", f"{current.wind_speed} m/s")
+                with col2:
+                    st.image(f"http://openweathermap.org/img/wn/{icon}@4x.png")
+
+                # --- Show hourly forecast instead of 7-day ---
+                display_hourly_forecast(report.hourly)
+            elif isinstance(error, quota.QuotaExceeded):
+                st.warning("⏳ The weather service is rate limited right now; try again later.")
+            else:
+                st.warning("Weather info not available.")
+
+    elif name == "news":
+        with news_slot.container():
+            if result and result.articles:
+                for article in result.articles:
+                    st.markdown(f"🔹 **[{article.title}]({article.url})**")
+                    if article.description:
+                        st.caption(article.description)
+                if result.stale:
+                    st.caption(f"⚠️ News last updated {int(result.age // 60)} min ago; showing the latest available headlines.")
+            else:
+                st.warning("🛑 Could not load news at the moment.")
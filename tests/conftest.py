@@ -0,0 +1,15 @@
+import os
+import shutil
+import tempfile
+
+# Runs before any test module imports cloudburst: the stores (quota, geocode,
+# observations, tiles) open their files at import time, and tests must never
+# spend the live daily quota or write to the real .cache.
+CACHE_DIR = tempfile.mkdtemp(prefix="cloudburst-tests-")
+os.environ["CLOUDBURST_CACHE_DIR"] = CACHE_DIR
+for name in ("QUOTA_PATH", "GEO_CACHE_PATH", "OBSERVATIONS_PATH"):
+    os.environ.pop(name, None)
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient  # noqa: E402
+
+from cloudburst.api import app  # noqa: E402
+
+client = TestClient(app)
+ROW = [20.0, 21.0, 0.9, 10.0, 180.0, 9.0, 1005.0]
+
+
+def test_predict_one_row():
+    res = client.post("/predict", json={"features": ROW})
+    assert res.status_code == 200
+    assert set(res.json()) == {"prediction", "cloudburst", "probability", "model_version"}
+
+
+def test_predict_batch():
+    res = client.post("/predict", json={"rows": [ROW, ROW]})
+    assert res.status_code == 200
+    assert len(res.json()["predictions"]) == 2
+
+
+@pytest.mark.parametrize("body", [
+    {"rows": [ROW, ROW[:3]]},
+    {"rows": [ROW + [1.0]]},
+    {"features": ROW[:6]},
+    {"rows": []},
+    {"features": ROW, "rows": [ROW]},
+    {},
+])
+def test_predict_rejects_bad_shapes(body):
+    assert client.post("/predict", json=body).status_code == 422
+
+
+def test_model_info():
+    res = client.get("/model")
+    assert res.status_code == 200
+    assert "path" not in res.json()
+    assert res.json()["version"] == client.post("/predict", json={"features": ROW}).json()["model_version"]
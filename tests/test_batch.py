@@ -0,0 +1,32 @@
+import gc
+import io
+import os
+
+from cloudburst.batch import ScoredFile, score_file
+from cloudburst.predict import FEATURES
+
+
+def _csv(rows):
+    header = ",".join(["Formatted Date"] + FEATURES)
+    lines = [f"2016-01-01 0{i}:00,{20 + i},19,0.9,10,180,9,1005" for i in range(rows)]
+    return io.StringIO("\n".join([header] + lines) + "\n")
+
+
+def test_score_file(tmp_path):
+    out = tmp_path / "scored.csv"
+    stats = score_file(_csv(3), out)
+    assert stats["rows"] == 3
+    assert out.read_text().splitlines()[0].endswith("Prediction,Cloudburst")
+
+
+def test_scored_file_is_removed():
+    result = ScoredFile("csv", "log_scored.csv")
+    path = result.path
+    result.discard()
+    assert not os.path.exists(path)
+
+    result = ScoredFile("csv", "log_scored.csv")
+    path = result.path
+    del result
+    gc.collect()
+    assert not os.path.exists(path)
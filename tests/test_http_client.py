@@ -0,0 +1,64 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cloudburst import http_client
+
+
+@pytest.fixture
+def upstream():
+    # Always 503 with a short Retry-After; yields (url, list of request paths)
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        retry_after = "30"
+
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(503)
+            self.send_header("Retry-After", self.retry_after)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/", hits, Handler
+    server.shutdown()
+
+
+def test_retries_stop_at_deadline(upstream):
+    url, _, _ = upstream
+    start = time.monotonic()
+    res = http_client.get(url, deadline=0.5)
+    assert res.status_code == 503
+    assert time.monotonic() - start < 1.5
+
+
+def test_deadline_is_per_call(upstream):
+    url, _, _ = upstream
+    http_client.get(url, deadline=0.1)
+    assert http_client._remaining() is None
+
+
+def test_on_retry_is_charged_per_attempt(upstream):
+    url, hits, handler = upstream
+    handler.retry_after = "0"
+    charged = []
+    res = http_client.get(url, on_retry=lambda: charged.append(1) or True)
+    assert res.status_code == 503
+    assert len(hits) == http_client.RETRIES + 1
+    assert len(charged) == http_client.RETRIES
+
+
+def test_on_retry_can_stop_retrying(upstream):
+    url, hits, handler = upstream
+    handler.retry_after = "0"
+    res = http_client.get(url, on_retry=lambda: False)
+    assert res.status_code == 503
+    assert len(hits) == 1
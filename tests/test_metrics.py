@@ -0,0 +1,21 @@
+from unittest import mock
+
+import pytest
+import requests
+
+from cloudburst import http_client, metrics
+
+
+def test_render_mixes_status_codes_and_errors():
+    ok = mock.Mock(status_code=200)
+    session = mock.Mock()
+    session.get.side_effect = [ok, requests.ConnectionError("down")]
+    with mock.patch.object(http_client, "session", return_value=session):
+        http_client.get("https://upstream.test/a")
+        with pytest.raises(requests.ConnectionError):
+            http_client.get("https://upstream.test/b")
+
+    text = metrics.render()
+    assert 'cloudburst_upstream_responses_total{status="200",upstream="upstream.test"} 1' in text
+    assert 'cloudburst_upstream_responses_total{status="ConnectionError",upstream="upstream.test"} 1' in text
+    sorted(metrics.counters().items())  # as the admin page does
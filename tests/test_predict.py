@@ -0,0 +1,32 @@
+from cloudburst import predict
+from cloudburst.predict import PredictionCache
+
+
+def test_key_follows_binarized_inputs():
+    # Both round to 0.0 at 4 decimals, but only the first is above binarize=0
+    predict.cache.clear()
+    tiny = predict.predict_one([0.00001, 1, 1, 1, 1, 1, 1])
+    zero = predict.predict_one([0.0, 1, 1, 1, 1, 1, 1])
+
+    predict.cache.clear()
+    assert predict.predict_one([0.0, 1, 1, 1, 1, 1, 1]) == zero
+    assert predict.predict_one([0.00001, 1, 1, 1, 1, 1, 1]) == tiny
+
+
+def test_same_bits_hit_the_cache():
+    predict.cache.clear()
+    before = predict.cache_stats()["hits"]
+    predict.predict_one([20.0, 21.0, 0.9, 10.0, 180.0, 9.0, 1005.0])
+    predict.predict_one([25.5, 19.0, 0.5, 3.0, 90.0, 12.0, 990.0])
+    assert predict.cache_stats()["hits"] == before + 1
+
+
+def test_lru_eviction():
+    cache = PredictionCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["size"] == 2
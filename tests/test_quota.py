@@ -0,0 +1,51 @@
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient  # noqa: E402
+
+from cloudburst import owm, quota  # noqa: E402
+from cloudburst.api import app  # noqa: E402
+
+
+def test_daily_count_survives_restart(tmp_path):
+    path = str(tmp_path / "quota.sqlite3")
+    first = quota.Budget("weather", per_minute=100, per_day=3, usage=quota.DailyUsage(path))
+    assert first.try_acquire() and first.try_acquire()
+
+    restarted = quota.Budget("weather", per_minute=100, per_day=3, usage=quota.DailyUsage(path))
+    assert restarted.stats()["used_today"] == 2
+    assert restarted.try_acquire()
+    assert not restarted.try_acquire()
+    assert not first.try_acquire()  # shared with the other process's budget
+
+
+def test_throttled_lookup_is_429_not_404():
+    owm.cache.clear()
+    empty = quota.Budget("weather", per_minute=60, per_day=0)
+    with mock.patch.dict(quota.budgets, {"weather": empty}), \
+            mock.patch("cloudburst.geo_store.store.get_place", return_value=None):
+        res = TestClient(app).get("/weather/Shimla")
+    assert res.status_code == 429
+    assert "try again later" in res.json()["detail"]
+
+
+def test_throttled_history_is_429():
+    owm.cache.clear()
+    empty = quota.Budget("weather", per_minute=60, per_day=0)
+    with mock.patch.dict(quota.budgets, {"weather": empty}), \
+            mock.patch("cloudburst.geo_store.store.get_place", return_value=None):
+        res = TestClient(app).get("/history/Shimla")
+    assert res.status_code == 429
+
+
+def test_throttled_history_cli_exits_cleanly(capsys):
+    from cloudburst import observations
+
+    owm.cache.clear()
+    empty = quota.Budget("weather", per_minute=60, per_day=0)
+    with mock.patch.dict(quota.budgets, {"weather": empty}), \
+            mock.patch("cloudburst.geo_store.store.get_place", return_value=None):
+        assert observations.main(["history", "--city", "Shimla"]) == 1
+    assert "try again later" in capsys.readouterr().err
@@ -0,0 +1,73 @@
+import os
+import pickle
+import shutil
+
+import numpy as np
+import pytest
+
+from cloudburst.model_registry import PICKLE_PATH, ModelRegistry
+from cloudburst.scorer import NBScorer, source_sha256
+
+BernoulliNB = pytest.importorskip("sklearn.naive_bayes").BernoulliNB
+
+
+def _sample(n_features, rows=20_000, seed=0):
+    # Around the binarize threshold, with exact zeros and tiny values on both sides
+    rng = np.random.default_rng(seed)
+    X = rng.normal(0, 50, size=(rows, n_features))
+    X[rng.random(X.shape) < 0.2] = 0.0
+    X[rng.random(X.shape) < 0.1] = 1e-6
+    X[rng.random(X.shape) < 0.1] = -1e-6
+    return X
+
+
+def _fitted(seed, binarize=0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(0, 1, size=(500, 7))
+    y = (X[:, 0] + rng.normal(0, 1, 500) > 0).astype(int)
+    if binarize is None:
+        # Already-binary input
+        X = (X > 0).astype(float)
+    return BernoulliNB(binarize=binarize).fit(X, y)
+
+
+def test_matches_shipped_model():
+    with open(PICKLE_PATH, "rb") as f:
+        model = pickle.load(f)
+    scorer = NBScorer.from_sklearn(model)
+    X = _sample(scorer.n_features_in_)
+    np.testing.assert_array_equal(scorer.predict(X), model.predict(X))
+    np.testing.assert_allclose(scorer.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("binarize", [0.0, 0.5, None])
+def test_matches_bernoulli_nb(tmp_path, binarize):
+    model = _fitted(1, binarize)
+    path = tmp_path / "model.npz"
+    NBScorer.from_sklearn(model).save(path)
+    scorer = NBScorer.load(path)
+    X = _sample(7, seed=2)
+    if binarize is None:
+        X = (X > 0).astype(float)
+    np.testing.assert_array_equal(scorer.predict(X), model.predict(X))
+    np.testing.assert_allclose(scorer.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+
+
+def test_registry_reexports_replaced_pickle(tmp_path):
+    pkl = tmp_path / "cbmodel.pkl"
+    shutil.copy(PICKLE_PATH, pkl)
+    registry = ModelRegistry(str(pkl))
+    first, info = registry.get_with_info()
+    assert isinstance(first, NBScorer)
+    assert source_sha256(tmp_path / "cbmodel.npz") == info["sha256"]
+
+    replacement = _fitted(3)
+    with open(pkl, "wb") as f:
+        pickle.dump(replacement, f)
+    os.utime(pkl, ns=(0, 0))
+
+    second, new_info = registry.get_with_info()
+    assert new_info["version"] != info["version"]
+    assert source_sha256(tmp_path / "cbmodel.npz") == new_info["sha256"]
+    X = _sample(7, rows=1000, seed=4)
+    np.testing.assert_allclose(second.predict_proba(X), replacement.predict_proba(X), rtol=0, atol=1e-12)
@@ -0,0 +1,15 @@
+from cloudburst import warmup
+
+
+def test_page_imports_read_from_scripts():
+    for page, path in warmup.PAGES.items():
+        modules = warmup.page_imports(path)
+        assert "streamlit" in modules, page
+        assert "cloudburst.warmup" in modules, page
+
+
+def test_lazy_imports_are_not_counted():
+    # The Cloudburst page only imports owm inside the live-prediction branch
+    modules = warmup.page_imports(warmup.PAGES["cloudburst"])
+    assert "cloudburst.predict" in modules
+    assert "cloudburst.owm" not in modules
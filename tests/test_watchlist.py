@@ -0,0 +1,46 @@
+import time
+from unittest import mock
+
+import requests
+
+from cloudburst import owm, watchlist
+from cloudburst.watchlist import Snapshot
+
+
+def test_rate_limit_counts_every_http_call():
+    owm.cache.clear()
+    waits, calls = [], []
+    limit = mock.Mock(wait=lambda: waits.append(1))
+
+    def upstream_down(url, **kwargs):
+        calls.append(url)
+        raise requests.ConnectionError("down")
+
+    with mock.patch("cloudburst.http_client.get", upstream_down), \
+            mock.patch("cloudburst.geo_store.store.get_place", return_value=None), \
+            mock.patch("cloudburst.observations.store.latest", return_value=None), \
+            mock.patch.object(watchlist, "_RateLimit", return_value=limit):
+        snapshot = watchlist.scan([("A", "Nowhere"), ("B", (10.0, 20.0))], "key")
+    assert snapshot.failed == ("A", "B")
+    assert len(calls) >= 3  # geocode for A, weather for B
+    assert len(waits) == len(calls)
+
+
+def test_failed_scan_keeps_previous_rows():
+    config = {"locations": [("A", "A")], "max_concurrency": 1, "requests_per_second": 5, "refresh": 3600}
+    scanner = watchlist.Watchlist("key", config)
+    scanner._snapshot = Snapshot(({"City": "A"},), 1.0, 0.1)
+    with mock.patch.object(watchlist, "scan", return_value=Snapshot((), time.time(), 0.1, ("A",))):
+        snapshot = scanner.start().snapshot(wait=5)
+    assert snapshot.rows == ({"City": "A"},)
+    assert snapshot.refreshed_at == 1.0
+    assert snapshot.error and snapshot.failed_at
+
+
+def test_scan_error_is_recorded():
+    config = {"locations": [("A", "A")], "max_concurrency": 1, "requests_per_second": 5, "refresh": 3600}
+    scanner = watchlist.Watchlist("key", config)
+    with mock.patch.object(watchlist, "scan", side_effect=RuntimeError("model missing")):
+        snapshot = scanner.start().snapshot(wait=5)
+    assert snapshot.rows == ()
+    assert snapshot.error == "model missing"